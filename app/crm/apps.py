@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CrmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.crm'
+
+    def ready(self):
+        from app.utils.cache import watch_models
+
+        watch_models(*self.get_models())
@@ -3,27 +3,48 @@ from datetime import datetime
 from app.crm.enums import PropertyStatus, ApprovalStatus, PaymentFor, PaymentStatus
 from app.crm.models import CRMLead, StatusChangeRequest, LeadStatusLog, SalesOfficerPerformance, Payment, SiteVisit
 from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 from app.crm.schemas import PaymentCreateSchema
-from app.properties.controllers import PlotController
-from app.properties.models import Plot
-from app.utils.controllers import Controller
+from app.crm.services import plot_book
+from app.properties.controllers import PlotController, PropertyController
+from app.utils.cache import invalidate_cache
+from app.utils.controllers import Controller, nest_query_plan
 from app.utils.helpers import get_serialized_exception
 
 
 class CRMLeadController(Controller):
+    select_related = ('property', 'phase', 'plot', 'customer__user__director', 'assigned_so__director') + \
+        nest_query_plan('property', PropertyController.select_related)
+    prefetch_related = ('customer__favorites',) + nest_query_plan('property', PropertyController.prefetch_related)
+    full_save_on_edit = True  # save() derives total_amount and marks the plot sold
+    # List rows (CRMLeadListSerializer) only need the direct relations and the lead's status change requests
+    list_select_related = ('property', 'phase', 'plot', 'customer', 'assigned_so')
+    list_prefetch_related = (
+        Prefetch('statuschangerequest_set', to_attr='status_change_requests',
+                 queryset=StatusChangeRequest.objects.select_related('requested_by__director', 'actioned_by__director')
+                 .order_by('-date_requested')),
+    )
+
     def __init__(self):
         self.model = CRMLead
 
+    def get_list_queryset(self):
+        amount_paid = Payment.objects.filter(crm_lead=OuterRef('pk')).order_by().values('crm_lead') \
+            .annotate(total=Sum('amount')).values('total')
+        return super().get_list_queryset().annotate(
+            amount_paid=Coalesce(Subquery(amount_paid), Value(0), output_field=DecimalField()),
+        )
+
     def edit(self, instance_id, **kwargs):
         try:
             with transaction.atomic():
                 instance: CRMLead = self.model.objects.get(id=instance_id)
 
                 # Update instance attributes
-                for attr, value in kwargs.items():
-                    if value:
-                        setattr(instance, attr, value)
+                for attr, value in self.get_changes(kwargs).items():
+                    setattr(instance, attr, value)
 
                 # Handle status change request
                 if (kwargs.get('current_crm_status') == PropertyStatus.DOCUMENTATION.value and
@@ -42,17 +63,24 @@ class CRMLeadController(Controller):
 
 
 class StatusChangeRequestController(Controller):
+    select_related = ('crm_lead', 'requested_by__director', 'actioned_by__director') + \
+        nest_query_plan('crm_lead', CRMLeadController.select_related)
+    prefetch_related = nest_query_plan('crm_lead', CRMLeadController.prefetch_related)
+    full_save_on_edit = True  # approving a request moves the lead, plot and payments along
+
     def __init__(self):
         self.model = StatusChangeRequest
 
     def create(self, **kwargs):
         try:
-            instance = self.model.objects.create(**kwargs)
-            instance: StatusChangeRequest = self.model.objects.select_related('crm_lead').get(id=instance.pk)
-            crm_lead: CRMLead = instance.crm_lead
-            crm_lead.current_crm_status = instance.requested_status
-            crm_lead.current_approval_status = instance.approval_status
-            crm_lead.save()
+            # The lead may hit crmlead_one_active_booking_per_plot; keep the request out if it does
+            with transaction.atomic():
+                instance = self.model.objects.create(**kwargs)
+                instance: StatusChangeRequest = self.model.objects.select_related('crm_lead').get(id=instance.pk)
+                crm_lead: CRMLead = instance.crm_lead
+                crm_lead.current_crm_status = instance.requested_status
+                crm_lead.current_approval_status = instance.approval_status
+                crm_lead.save()
             return None, instance
         except (IntegrityError, ValueError) as e:
             return get_serialized_exception(e)
@@ -60,13 +88,15 @@ class StatusChangeRequestController(Controller):
     def edit(self, instance_id, **kwargs):
         try:
             with transaction.atomic():
-                instance: StatusChangeRequest = self.model.objects.select_related('crm_lead').get(id=instance_id)
+                # Lock the request and its lead so concurrent approvals of the same lead run one after the other
+                instance: StatusChangeRequest = self.model.objects.select_related('crm_lead').select_for_update() \
+                    .get(id=instance_id)
                 crm_lead: CRMLead = instance.crm_lead
+                previous_approval_status = instance.approval_status
 
                 # Update instance attributes
-                for attr, value in kwargs.items():
-                    if value:
-                        setattr(instance, attr, value)
+                for attr, value in self.get_changes(kwargs).items():
+                    setattr(instance, attr, value)
 
                 if 'approval_status' in kwargs:
                     approval_status = kwargs['approval_status']
@@ -76,12 +106,11 @@ class StatusChangeRequestController(Controller):
                     payment_updates = []
 
                     if approval_status == ApprovalStatus.COMPLETED.value:
-                        if instance.requested_status == PropertyStatus.TOKEN_ADVANCE:
-                            # Update plot as booked if plot_id is provided
-                            selected_plot: Plot = crm_lead.plot
-                            if selected_plot:
-                                selected_plot.is_booked = True
-                                selected_plot.save()
+                        # A repeated approval (client retry, remarks-only re-save) already booked the plot
+                        if (instance.requested_status == PropertyStatus.TOKEN_ADVANCE and
+                                previous_approval_status != ApprovalStatus.COMPLETED):
+                            # Raises PlotUnavailable (rolling all of this back) when another lead got the plot first
+                            plot_book(crm_lead=crm_lead)
 
                     if approval_status == ApprovalStatus.APPROVED.value:
                         if instance.requested_status == PropertyStatus.TOKEN_ADVANCE:
@@ -120,6 +149,7 @@ class StatusChangeRequestController(Controller):
                     # Bulk update payments
                     if payment_updates:
                         Payment.objects.bulk_update(payment_updates, ['payment_status'])
+                        invalidate_cache(Payment)
 
                 instance.save()
 
@@ -139,6 +169,10 @@ class SalesOfficerPerformanceController(Controller):
 
 
 class PaymentController(Controller):
+    select_related = ('crm_lead',) + nest_query_plan('crm_lead', CRMLeadController.select_related)
+    prefetch_related = nest_query_plan('crm_lead', CRMLeadController.prefetch_related)
+    full_save_on_edit = True  # save() fills in the backend reference number
+
     def __init__(self):
         self.model = Payment
 
@@ -178,6 +212,9 @@ class PaymentController(Controller):
 
 
 class SiteVisitController(Controller):
+    select_related = ('crm_lead',) + nest_query_plan('crm_lead', CRMLeadController.select_related)
+    prefetch_related = nest_query_plan('crm_lead', CRMLeadController.prefetch_related)
+
     def __init__(self):
         self.model = SiteVisit
 
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0012_alter_payment_crm_lead'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='crmlead',
+            index=models.Index(fields=['created_at', 'id'], name='crmlead_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='payment_created_at_id_idx'),
+        ),
+    ]
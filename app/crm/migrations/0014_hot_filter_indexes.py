@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0013_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='crmlead',
+            index=models.Index(fields=['assigned_so', 'is_active', 'current_crm_status'], name='crmlead_so_active_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='crmlead',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['updated_at'], name='crmlead_active_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['crm_lead', 'payment_for'], name='payment_lead_payment_for_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statuschangerequest',
+            index=models.Index(fields=['crm_lead', 'requested_status', 'approval_status'], name='statuschange_lead_status_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Same condition as crmlead_one_active_booking_per_plot on app.crm.models.CRMLead
+BOOKING_STATUSES = (2, 3, 4, 5)
+REJECTED = 3
+
+
+def check_no_double_bookings(apps, schema_editor):
+    CRMLead = apps.get_model('crm', 'CRMLead')
+    active_bookings = CRMLead.objects.filter(is_active=True, current_crm_status__in=BOOKING_STATUSES,
+                                             plot__isnull=False).exclude(current_approval_status=REJECTED)
+    plot_ids = list(active_bookings.order_by().values('plot').annotate(leads=Count('pk'))
+                    .filter(leads__gt=1).values_list('plot', flat=True))
+    if not plot_ids:
+        return
+    duplicates = []
+    for plot_id in plot_ids:
+        lead_ids = sorted(active_bookings.filter(plot_id=plot_id).values_list('pk', flat=True))
+        duplicates.append(f"plot {plot_id}: leads {', '.join(map(str, lead_ids))}")
+    raise RuntimeError(
+        "Cannot add crmlead_one_active_booking_per_plot: these plots have more than one active, non-rejected "
+        "lead from TOKEN_ADVANCE onwards. Reject or deactivate all but one lead per plot, then migrate again.\n"
+        + "\n".join(duplicates)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0014_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='crmlead',
+            constraint=models.UniqueConstraint(condition=models.Q(('current_crm_status__in', (2, 3, 4, 5)), ('is_active', True), models.Q(('current_approval_status', 3), _negated=True)), fields=('plot',), name='crmlead_one_active_booking_per_plot'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0015_crmlead_one_active_booking_per_plot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='crm_lead',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='crm.crmlead'),
+        ),
+        migrations.AlterField(
+            model_name='statuschangerequest',
+            name='crm_lead',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='crm.crmlead'),
+        ),
+    ]
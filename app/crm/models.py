@@ -2,15 +2,20 @@ import random
 import uuid
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.db.models import JSONField
 from django.utils.timezone import now
 
 from app.crm.enums import PropertyStatus, PaymentMode, PaymentStatus, PaymentFor, DocumentStatus, ApprovalStatus, \
     PaymentMethod
+from app.crm.services import plot_mark_sold
 
 User = get_user_model()
 
+# Lead stages that hold the lead's plot: only one active lead per plot may be in them at a time.
+BOOKING_STATUSES = (PropertyStatus.TOKEN_ADVANCE, PropertyStatus.DOCUMENTATION, PropertyStatus.PAYMENT,
+                    PropertyStatus.DOCUMENT_DELIVERY)
+
 
 class CRMLead(models.Model):
     property = models.ForeignKey("properties.Property", on_delete=models.CASCADE)
@@ -30,6 +35,27 @@ class CRMLead(models.Model):
         default=True,
     )
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the lead list
+            models.Index(fields=['created_at', 'id'], name='crmlead_created_at_id_idx'),
+            # A sales officer's active leads by stage (lead list filters, UserSerializer.get_clients)
+            models.Index(fields=['assigned_so', 'is_active', 'current_crm_status'],
+                         name='crmlead_so_active_status_idx'),
+            # deactivate_old_crm_leads only scans leads that are still active
+            models.Index(fields=['updated_at'], condition=models.Q(is_active=True),
+                         name='crmlead_active_updated_at_idx'),
+        ]
+        constraints = [
+            # Backs app.crm.services.plot_book: a second lead can't move into a booking stage on a held plot
+            models.UniqueConstraint(
+                fields=['plot'],
+                condition=models.Q(is_active=True, current_crm_status__in=BOOKING_STATUSES) &
+                ~models.Q(current_approval_status=ApprovalStatus.REJECTED),
+                name='crmlead_one_active_booking_per_plot',
+            ),
+        ]
+
     def __str__(self):
         return f"CRM Lead {self.id} Property-{self.property.name} Customer-{self.customer.name} SO-{self.assigned_so.name}"
 
@@ -38,17 +64,19 @@ class CRMLead(models.Model):
         if self.plot and self.plot.price and self.plot.area_size:
             self.total_amount = self.plot.price * self.plot.area_size
 
-        # Update plot sold status based on CRM and approval status
-        if self.current_crm_status == PropertyStatus.DOCUMENT_DELIVERY and self.current_approval_status == ApprovalStatus.COMPLETED:
-            if self.plot:
-                self.plot.is_sold = True
-                self.plot.save()
+        # The plot write (and the phase aggregates it refreshes) commits or rolls back with the lead
+        with transaction.atomic():
+            # Update plot sold status based on CRM and approval status
+            if (self.current_crm_status == PropertyStatus.DOCUMENT_DELIVERY and
+                    self.current_approval_status == ApprovalStatus.COMPLETED):
+                plot_mark_sold(crm_lead=self)
 
-        super(CRMLead, self).save(*args, **kwargs)
+            super(CRMLead, self).save(*args, **kwargs)
 
 
 class StatusChangeRequest(models.Model):
-    crm_lead = models.ForeignKey(CRMLead, on_delete=models.CASCADE)
+    # Indexed by statuschange_lead_status_idx, which leads with crm_lead
+    crm_lead = models.ForeignKey(CRMLead, on_delete=models.CASCADE, db_index=False)
     requested_by = models.ForeignKey(User, related_name='requested_changes', on_delete=models.CASCADE, blank=True,
                                      null=True)
     actioned_by = models.ForeignKey(User, related_name='actioned_changes', on_delete=models.CASCADE, blank=True,
@@ -61,6 +89,13 @@ class StatusChangeRequest(models.Model):
     date_approved = models.DateTimeField(blank=True, null=True)
     date_rejected = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # The request matching a lead's current status (lead serializers, list filters)
+            models.Index(fields=['crm_lead', 'requested_status', 'approval_status'],
+                         name='statuschange_lead_status_idx'),
+        ]
+
     def __str__(self):
         return f"StatusChangeRequest {self.id} requested_by-{self.requested_by.name} requested_status-{self.requested_status}"
 
@@ -82,7 +117,8 @@ class SalesOfficerPerformance(models.Model):
 
 
 class Payment(models.Model):
-    crm_lead = models.ForeignKey(CRMLead, related_name='payments', on_delete=models.CASCADE)
+    # Indexed by payment_lead_payment_for_idx, which leads with crm_lead
+    crm_lead = models.ForeignKey(CRMLead, related_name='payments', on_delete=models.CASCADE, db_index=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     payment_method = models.PositiveSmallIntegerField(choices=PaymentMethod.choices, blank=True, null=True)
     payment_status = models.IntegerField(choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
@@ -95,6 +131,14 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the payment list
+            models.Index(fields=['created_at', 'id'], name='payment_created_at_id_idx'),
+            # Token/balance payments of a lead (status change approvals, payment list filters)
+            models.Index(fields=['crm_lead', 'payment_for'], name='payment_lead_payment_for_idx'),
+        ]
+
     def __str__(self):
         return f"Payment {self.id} ({self.amount} {self.payment_for} {self.payment_method} {self.payment_date})"
 
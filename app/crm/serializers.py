@@ -4,9 +4,9 @@ from rest_framework import serializers
 from app.crm.enums import PropertyStatus, ApprovalStatus, PaymentMethod, PaymentStatus, PaymentFor
 from app.crm.models import CRMLead, StatusChangeRequest, LeadStatusLog, SalesOfficerPerformance, Payment, SiteVisit
 from app.properties.serializers import PlotSerializer, PropertySerializer, PhaseSerializer, PlotSerializerSimple, \
-    PhaseSerializerComplex
-from app.users.serializers import CustomerSerializer, UserSerializer
-from app.utils.helpers import get_serialized_enum
+    PhaseSerializerComplex, PhaseSerializerSimple, PropertySerializerSimple
+from app.users.serializers import CustomerSerializer, UserSerializer, CustomerSerializerSimple, UserSerializerSimple
+from app.utils.serializers import EnumField
 
 
 class CRMLeadSerializer(serializers.ModelSerializer):
@@ -15,8 +15,8 @@ class CRMLeadSerializer(serializers.ModelSerializer):
     plot = PlotSerializerSimple()
     customer = CustomerSerializer()
     assigned_so = UserSerializer()
-    current_crm_status = serializers.SerializerMethodField()
-    current_approval_status = serializers.SerializerMethodField()
+    current_crm_status = EnumField(PropertyStatus)
+    current_approval_status = EnumField(ApprovalStatus)
     status_change_request = serializers.SerializerMethodField()
     amount_to_paid = serializers.SerializerMethodField()
     is_site_visit_done = serializers.SerializerMethodField()
@@ -29,16 +29,6 @@ class CRMLeadSerializer(serializers.ModelSerializer):
         total_paid_amount = obj.payments.aggregate(Sum('amount'))['amount__sum'] or 0
         return obj.total_amount - total_paid_amount if obj.total_amount else None
 
-    def get_current_crm_status(self, obj: CRMLead):
-        if obj.current_crm_status:
-            return get_serialized_enum(PropertyStatus(obj.current_crm_status))
-        return dict()
-
-    def get_current_approval_status(self, obj: CRMLead):
-        if obj.current_approval_status:
-            return get_serialized_enum(ApprovalStatus(obj.current_approval_status))
-        return dict()
-
     def get_status_change_request(self, obj: CRMLead):
         try:
             request = StatusChangeRequest.objects.get(
@@ -88,22 +78,33 @@ class CRMLeadSerializer(serializers.ModelSerializer):
                   'is_documentation_done', 'is_payment_done', 'is_document_delivery_done']
 
 
+class CRMLeadListSerializer(CRMLeadSerializer):
+    """
+    Compact lead rows for the list endpoint. Reads `amount_paid` and `status_change_requests` prepared by
+    CRMLeadController.get_list_queryset instead of querying per lead.
+    """
+    property = PropertySerializerSimple()
+    phase = PhaseSerializerSimple()
+    customer = CustomerSerializerSimple()
+    assigned_so = UserSerializerSimple()
+
+    def get_amount_to_paid(self, obj: CRMLead):
+        return obj.total_amount - obj.amount_paid if obj.total_amount else None
+
+    def get_status_change_request(self, obj: CRMLead):
+        for request in obj.status_change_requests:
+            if (request.requested_status, request.approval_status) == \
+                    (obj.current_crm_status, obj.current_approval_status):
+                return StatusChangeRequestSimpleSerializer(request).data
+        return None
+
+
 class StatusChangeRequestSerializer(serializers.ModelSerializer):
     crm_lead = CRMLeadSerializer()
     requested_by = UserSerializer()
     actioned_by = UserSerializer()
-    requested_status = serializers.SerializerMethodField()
-    approval_status = serializers.SerializerMethodField()
-
-    def get_requested_status(self, obj: StatusChangeRequest):
-        if obj.requested_status:
-            return get_serialized_enum(PropertyStatus(obj.requested_status))
-        return dict()
-
-    def get_approval_status(self, obj: StatusChangeRequest):
-        if obj.approval_status:
-            return get_serialized_enum(ApprovalStatus(obj.approval_status))
-        return dict()
+    requested_status = EnumField(PropertyStatus)
+    approval_status = EnumField(ApprovalStatus)
 
     class Meta:
         model = StatusChangeRequest
@@ -113,18 +114,8 @@ class StatusChangeRequestSerializer(serializers.ModelSerializer):
 class StatusChangeRequestSimpleSerializer(serializers.ModelSerializer):
     requested_by = UserSerializer()
     actioned_by = UserSerializer()
-    requested_status = serializers.SerializerMethodField()
-    approval_status = serializers.SerializerMethodField()
-
-    def get_requested_status(self, obj: StatusChangeRequest):
-        if obj.requested_status:
-            return get_serialized_enum(PropertyStatus(obj.requested_status))
-        return dict()
-
-    def get_approval_status(self, obj: StatusChangeRequest):
-        if obj.approval_status:
-            return get_serialized_enum(ApprovalStatus(obj.approval_status))
-        return dict()
+    requested_status = EnumField(PropertyStatus)
+    approval_status = EnumField(ApprovalStatus)
 
     class Meta:
         model = StatusChangeRequest
@@ -139,18 +130,8 @@ class StatusChangeRequestSimpleSerializer(serializers.ModelSerializer):
 class LeadStatusLogSerializer(serializers.ModelSerializer):
     changed_by = UserSerializer()
     crm_lead = CRMLeadSerializer()
-    previous_status = serializers.SerializerMethodField()
-    new_status = serializers.SerializerMethodField()
-
-    def get_previous_status(self, obj: LeadStatusLog):
-        if obj.previous_status:
-            return get_serialized_enum(PropertyStatus(obj.previous_status))
-        return dict()
-
-    def get_new_status(self, obj: LeadStatusLog):
-        if obj.new_status:
-            return get_serialized_enum(PropertyStatus(obj.new_status))
-        return dict()
+    previous_status = EnumField(PropertyStatus)
+    new_status = EnumField(PropertyStatus)
 
     class Meta:
         model = LeadStatusLog
@@ -167,24 +148,9 @@ class SalesOfficerPerformanceSerializer(serializers.ModelSerializer):
 
 class PaymentSerializer(serializers.ModelSerializer):
     crm_lead = CRMLeadSerializer()
-    payment_method = serializers.SerializerMethodField()
-    payment_status = serializers.SerializerMethodField()
-    payment_for = serializers.SerializerMethodField()
-
-    def get_payment_method(self, obj: Payment):
-        if obj.payment_method:
-            return get_serialized_enum(PaymentMethod(obj.payment_method))
-        return dict()
-
-    def get_payment_status(self, obj: Payment):
-        if obj.payment_status:
-            return get_serialized_enum(PaymentStatus(obj.payment_status))
-        return dict()
-
-    def get_payment_for(self, obj: Payment):
-        if obj.payment_for:
-            return get_serialized_enum(PaymentFor(obj.payment_for))
-        return dict()
+    payment_method = EnumField(PaymentMethod)
+    payment_status = EnumField(PaymentStatus)
+    payment_for = EnumField(PaymentFor)
 
     class Meta:
         model = Payment
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.utils import timezone
+
+from app.properties.models import Phase, Plot
+from app.utils.cache import invalidate_cache
+
+
+class PlotUnavailable(ValueError):
+    """The plot was taken by another lead; controllers report it like any other ValueError."""
+
+
+def plot_book(*, crm_lead) -> None:
+    """
+    Mark the lead's plot booked with a conditional UPDATE (`... WHERE is_booked = false`).
+    Of two concurrent bookings only one changes a row; the other raises PlotUnavailable, rolling back its caller.
+    """
+    if crm_lead.plot_id is None:
+        return
+    with transaction.atomic(savepoint=False):
+        booked = Plot.objects.filter(pk=crm_lead.plot_id, is_booked=False) \
+            .update(is_booked=True, updated_at=timezone.now())
+        if not booked:
+            raise PlotUnavailable(f"Plot {crm_lead.plot_id} is already booked")
+        phase_ids = set(Plot.objects.filter(pk=crm_lead.plot_id).values_list('phase_id', flat=True))
+        Phase.refresh_plot_aggregates(phase_ids)
+        invalidate_cache(Plot)
+
+
+def plot_mark_sold(*, crm_lead) -> None:
+    """Mark the lead's plot sold, touching only that column so a stale plot instance can't undo a booking."""
+    if crm_lead.plot_id is None:
+        return
+    Plot.objects.filter(pk=crm_lead.plot_id).update(is_sold=True, updated_at=timezone.now())
+    invalidate_cache(Plot)
@@ -1,6 +1,7 @@
 from celery import shared_task
 from django.utils.timezone import now
 from datetime import timedelta
+from app.utils.cache import invalidate_cache
 from .models import CRMLead
 
 @shared_task
@@ -10,4 +11,6 @@ def deactivate_old_crm_leads():
         is_active=True
     )
     count = outdated_leads.update(is_active=False)
+    if count:
+        invalidate_cache(CRMLead)
     return f'Deactivated {count} leads.'
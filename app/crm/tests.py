@@ -1,3 +1,148 @@
-from django.test import TestCase
+import json
+import threading
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from rest_framework.test import APIRequestFactory
+
+from app.crm.enums import ApprovalStatus, PaymentFor, PropertyStatus
+from app.crm.models import CRMLead, Payment, StatusChangeRequest
+from app.crm.controllers import StatusChangeRequestController
+from app.crm.services import PlotUnavailable, plot_book
+from app.crm.views import CRMLeadViewSet, PaymentViewSet
+from app.properties.models import Phase, Plot
+from app.properties.tests import create_property_tree
+
+
+class QueryPlanTests(TestCase):
+    """Query budgets for the CRM endpoints, see app.properties.tests.QueryPlanTests."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.properties = [create_property_tree(index) for index in range(4)]
+        for property in self.properties:
+            phase = property.phases.first()
+            lead = CRMLead.objects.create(
+                property=property, phase=phase, plot=phase.plots.first(),
+                customer=property.current_lead, assigned_so=property.created_by,
+            )
+            Payment.objects.create(crm_lead=lead, amount=100, payment_for=PaymentFor.TOKEN)
+
+    def test_crm_lead_list(self):
+        view = CRMLeadViewSet.as_view({"get": "list"})
+        # keyset page with amount paid annotated, then the status change requests of the page
+        with self.assertNumQueries(2):
+            response = view(self.factory.get("/crm-leads/")).render()
+        self.assertEqual(4, len(response.data["results"]))
+
+    def test_crm_lead_list_rows_match_retrieve(self):
+        lead = CRMLead.objects.get(property=self.properties[0])
+        StatusChangeRequest.objects.create(crm_lead=lead, requested_status=PropertyStatus.SITE_VISIT,
+                                           approval_status=ApprovalStatus.APPROVED)
+        current = StatusChangeRequest.objects.create(crm_lead=lead, requested_status=PropertyStatus.TOKEN_ADVANCE,
+                                                     approval_status=ApprovalStatus.PENDING)
+        CRMLead.objects.filter(pk=lead.pk).update(current_crm_status=PropertyStatus.TOKEN_ADVANCE,
+                                                  current_approval_status=ApprovalStatus.PENDING, total_amount=1000)
+
+        rows = CRMLeadViewSet.as_view({"get": "list"})(self.factory.get("/crm-leads/")).data["results"]
+        row = next(row for row in rows if row["id"] == lead.pk)
+        detail = json.loads(CRMLeadViewSet.as_view({"get": "retrieve"})(self.factory.get("/"), pk=lead.pk).content)
+
+        self.assertEqual(current.pk, row["status_change_request"]["id"])
+        self.assertEqual(detail["status_change_request"]["id"], row["status_change_request"]["id"])
+        self.assertEqual(900, row["amount_to_paid"])
+        self.assertEqual(900, float(detail["amount_to_paid"]))
+        self.assertEqual({"id", "property_type", "name", "location"}, set(row["property"]))
+        self.assertIn("phases", detail["property"])
+
+    def test_payment_list(self):
+        view = PaymentViewSet.as_view({"get": "list"})
+        with self.assertNumQueries(6 + 4 * 5):
+            response = view(self.factory.get("/payments/")).render()
+        self.assertEqual(4, len(response.data["results"]))
+
+
+def create_leads(property, count):
+    phase = property.phases.get()
+    return [CRMLead.objects.create(property=property, phase=phase, plot=phase.plots.get(),
+                                   customer=property.current_lead, assigned_so=property.created_by)
+            for _ in range(count)]
+
+
+class PlotBookingTests(TestCase):
+    def setUp(self):
+        self.property = create_property_tree(0)
+        self.first, self.second = create_leads(self.property, 2)
+        self.plot = self.first.plot
+
+    def request_token_advance(self, lead):
+        return StatusChangeRequestController().create(crm_lead=lead, requested_by=lead.assigned_so,
+                                                      requested_status=PropertyStatus.TOKEN_ADVANCE,
+                                                      approval_status=ApprovalStatus.PENDING)
+
+    def test_completed_token_advance_books_the_plot_once(self):
+        _, request = self.request_token_advance(self.first)
+        StatusChangeRequestController().edit(request.pk, approval_status=ApprovalStatus.COMPLETED)
+        self.plot.refresh_from_db()
+        self.assertTrue(self.plot.is_booked)
+        self.assertEqual(0, Phase.objects.get(pk=self.plot.phase_id).available_plot_count)
+
+        with self.assertRaises(PlotUnavailable):
+            plot_book(crm_lead=self.second)
+
+    def test_repeated_completed_approval_is_idempotent(self):
+        _, request = self.request_token_advance(self.first)
+        StatusChangeRequestController().edit(request.pk, approval_status=ApprovalStatus.COMPLETED)
+        errors, request = StatusChangeRequestController().edit(request.pk, approval_status=ApprovalStatus.COMPLETED,
+                                                               remarks="Re-saved")
+        self.assertIsNone(errors)
+        self.assertEqual("Re-saved", StatusChangeRequest.objects.get(pk=request.pk).remarks)
+        self.plot.refresh_from_db()
+        self.assertTrue(self.plot.is_booked)
+
+    def test_one_active_lead_per_plot_in_a_booking_stage(self):
+        self.request_token_advance(self.first)
+        errors, _ = self.request_token_advance(self.second)
+        self.assertIsNotNone(errors)
+        self.assertFalse(StatusChangeRequest.objects.filter(crm_lead=self.second).exists())
+
+        # A rejected or inactive lead no longer holds the plot
+        CRMLead.objects.filter(pk=self.first.pk).update(current_approval_status=ApprovalStatus.REJECTED)
+        errors, _ = self.request_token_advance(self.second)
+        self.assertIsNone(errors)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CRMLead.objects.filter(pk=self.first.pk).update(current_approval_status=ApprovalStatus.PENDING)
+
+
+@skipUnlessDBFeature('has_select_for_update')  # needs a server database; SQLite locks whole tables
+class ConcurrentPlotBookingTests(TransactionTestCase):
+    """Many leads booking one plot at once: exactly one wins, the rest see PlotUnavailable."""
+
+    workers = 8
+
+    def test_concurrent_bookings(self):
+        leads = create_leads(create_property_tree(0), self.workers)
+        barrier = threading.Barrier(self.workers)
+        outcomes = []
+
+        def book(lead):
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    plot_book(crm_lead=lead)
+                outcomes.append('booked')
+            except PlotUnavailable:
+                outcomes.append('unavailable')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(lead,)) for lead in leads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['booked'] + ['unavailable'] * (self.workers - 1), sorted(outcomes))
+        self.assertTrue(Plot.objects.get(pk=leads[0].plot_id).is_booked)
@@ -2,27 +2,37 @@ from rest_framework.decorators import action
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter, OpenApiResponse
 
 from app.crm.controllers import CRMLeadController, StatusChangeRequestController, PaymentController, SiteVisitController
+from app.crm.models import StatusChangeRequest, Payment, SiteVisit
 from app.crm.schemas import CRMLeadCreateSchema, CRMLeadUpdateSchema, CRMLeadListSchema, \
     StatusChangeRequestCreateSchema, StatusChangeRequestUpdateSchema, StatusChangeRequestListSchema, \
     PaymentCreateSchema, PaymentUpdateSchema, PaymentListSchema, SiteVisitCreateSchema, SiteVisitUpdateSchema, \
     SiteVisitListSchema
-from app.crm.serializers import CRMLeadSerializer, StatusChangeRequestSerializer, PaymentSerializer, SiteVisitSerializer
+from app.crm.serializers import CRMLeadSerializer, CRMLeadListSerializer, StatusChangeRequestSerializer, \
+    PaymentSerializer, SiteVisitSerializer
 from app.properties.controllers import PropertyController, PhaseController, PlotController
 from app.properties.schemas import PropertyUpdateSchema, PropertyCreateSchema, PropertyListSchema, PhaseCreateSchema, \
     PhaseUpdateSchema, PhaseListSchema, PlotCreateSchema, PlotUpdateSchema, PlotListSchema
 from app.properties.serializers import PropertySerializer, PhaseSerializer, PlotSerializer
+from app.properties.views import PROPERTY_CACHE_MODELS
 from app.utils.constants import CacheKeys
+from app.utils.pagination import KeysetPagination
 from app.utils.views import BaseViewSet
 
+# Every model read by the nested CRM lead payload.
+CRM_LEAD_CACHE_MODELS = PROPERTY_CACHE_MODELS + (StatusChangeRequest, Payment)
+
 
 class CRMLeadViewSet(BaseViewSet):
     controller = CRMLeadController()  # Replace with your actual controller
     serializer = CRMLeadSerializer  # Replace with your actual serializer
+    list_serializer = CRMLeadListSerializer
     create_schema = CRMLeadCreateSchema
     update_schema = CRMLeadUpdateSchema
     list_schema = CRMLeadListSchema
     cache_key_retrieve = CacheKeys.CRM_LEAD_DETAILS_BY_PK  # Update as needed
     cache_key_list = CacheKeys.CRM_LEAD_LIST  # Update as needed
+    cache_models = CRM_LEAD_CACHE_MODELS
+    pagination_class = KeysetPagination
 
     @extend_schema(
         description="Create a new CRM lead",
@@ -80,7 +90,7 @@ class CRMLeadViewSet(BaseViewSet):
             OpenApiParameter(name='assigned_so_id', type=int),
             OpenApiParameter(name='current_status', type=int),
         ],
-        responses={200: CRMLeadSerializer(many=True)}
+        responses={200: CRMLeadListSerializer(many=True)}
     )
     def list(self, request, **kwargs):
         return super().list(request, **kwargs)
@@ -117,6 +127,7 @@ class StatusChangeRequestViewSet(BaseViewSet):
     list_schema = StatusChangeRequestListSchema
     cache_key_retrieve = CacheKeys.STATUS_CHANGE_REQUEST_DETAILS_BY_PK
     cache_key_list = CacheKeys.STATUS_CHANGE_REQUEST_LIST
+    cache_models = CRM_LEAD_CACHE_MODELS
 
     @extend_schema(
         description="Create a new status change request",
@@ -191,6 +202,8 @@ class PaymentViewSet(BaseViewSet):
     list_schema = PaymentListSchema
     cache_key_retrieve = CacheKeys.PAYMENT_DETAILS_BY_PK  # Update as needed
     cache_key_list = CacheKeys.PAYMENT_LIST  # Update as needed
+    cache_models = CRM_LEAD_CACHE_MODELS
+    pagination_class = KeysetPagination
 
     @extend_schema(
         description="Create a new payment",
@@ -268,6 +281,7 @@ class SiteVisitViewSet(BaseViewSet):
     list_schema = SiteVisitListSchema
     cache_key_retrieve = CacheKeys.SITE_VISIT_DETAILS_BY_PK  # Update as needed
     cache_key_list = CacheKeys.SITE_VISIT_LIST  # Update as needed
+    cache_models = CRM_LEAD_CACHE_MODELS + (SiteVisit,)
 
     @extend_schema(
         description="Create a new site visit",
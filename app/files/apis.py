@@ -13,7 +13,7 @@ from app.files.services import (
     FileStandardUploadService,
 )
 from app.users.serializers import UserSerializer
-from app.utils.helpers import get_serialized_enum
+from app.utils.enum_lookup import get_enum_lookup
 
 
 class FileListApi(APIView):
@@ -47,8 +47,8 @@ class FileListApi(APIView):
             "file_url": file.url,
             "file_name": file.original_file_name,
             "file_type": file.file_type,
-            "file_usage_type": get_serialized_enum(FileUsageType(file.file_usage_type)),
-            "crm_document_type": get_serialized_enum(CRMDocumentType(file.crm_document_type))
+            "file_usage_type": get_enum_lookup(FileUsageType, file.file_usage_type),
+            "crm_document_type": get_enum_lookup(CRMDocumentType, file.crm_document_type)
             if file.crm_document_type else dict(),
             "crm_lead": CRMLeadSerializer(file.crm_lead).data if file.crm_lead else None,
             "uploaded_by": UserSerializer(file.uploaded_by).data if file.uploaded_by else None,
@@ -67,8 +67,8 @@ class FileRetrieveApi(APIView):
             "file_url": file.url,
             "file_name": file.original_file_name,
             "file_type": file.file_type,
-            "file_usage_type": get_serialized_enum(FileUsageType(file.file_usage_type)),
-            "crm_document_type": get_serialized_enum(CRMDocumentType(file.crm_document_type))
+            "file_usage_type": get_enum_lookup(FileUsageType, file.file_usage_type),
+            "crm_document_type": get_enum_lookup(CRMDocumentType, file.crm_document_type)
             if file.crm_document_type else dict(),
             "crm_lead": CRMLeadSerializer(file.crm_lead).data if file.crm_lead else None,
             "uploaded_by": UserSerializer(file.uploaded_by).data if file.uploaded_by else None,
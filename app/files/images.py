@@ -0,0 +1,97 @@
+"""
+Resized WebP/JPEG variants of uploaded images (property, update, amenity, attraction and customer pictures).
+
+Saving a model with a watched image field queues `generate_image_variants` once the transaction commits. The task
+writes every size and format next to the original and records them in the model's `<field>_variants` JSON column,
+which `app.utils.serializers.ImageVariantsField` renders as a srcset-style map. Variant names derive from the
+original's, so a re-run overwrites its own output, and it is skipped when the recorded variants match the original.
+"""
+import os
+from functools import partial
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+# Longest side in pixels; smaller originals are re-encoded but never enlarged.
+IMAGE_VARIANT_SIZES = {'thumb': 240, 'card': 720, 'full': 1600}
+IMAGE_VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# model -> names of its image fields that get variants
+IMAGE_VARIANT_FIELDS = {}
+
+
+def get_variants_field_name(field_name):
+    return f'{field_name}_variants'
+
+
+def get_variant_name(name, size, image_format):
+    # Keep the original's extension: photo.png and photo.jpg are different uploads
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, 'variants', f'{filename}.{size}.{image_format}')
+
+
+def has_current_variants(instance, field_name):
+    image = getattr(instance, field_name)
+    variants = getattr(instance, get_variants_field_name(field_name)) or {}
+    return bool(image) and variants.get('source') == image.name
+
+
+def get_variant_files(variants):
+    return [name for size in (variants or {}).get('sizes', {}).values() for name in size['files'].values()]
+
+
+def flatten(image):
+    """RGB copy of `image` for JPEG, with any transparency composited onto white."""
+    if image.mode not in ('RGBA', 'LA') and 'transparency' not in image.info:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def build_image_variants(field_file):
+    """Write every variant of `field_file` to its storage and return the `<field>_variants` value describing them."""
+    with field_file.open('rb'), Image.open(field_file) as original:
+        # Phone photos are often stored sideways with an EXIF rotation
+        original = ImageOps.exif_transpose(original)
+        has_alpha = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+        original = original.convert('RGBA' if has_alpha else 'RGB')
+
+    storage = field_file.storage
+    sizes = {}
+    for size, longest_side in IMAGE_VARIANT_SIZES.items():
+        resized = original.copy()
+        resized.thumbnail((longest_side, longest_side), Image.LANCZOS)
+        files = {}
+        for image_format, (pil_format, options) in IMAGE_VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            (resized if pil_format == 'WEBP' else flatten(resized)).save(buffer, pil_format, **options)
+            name = get_variant_name(field_file.name, size, image_format)
+            # Overwrite in place: the file system storage would otherwise save a re-run under a new name
+            storage.delete(name)
+            files[image_format] = storage.save(name, ContentFile(buffer.getvalue()))
+        sizes[size] = {'width': resized.width, 'height': resized.height, 'files': files}
+    return {'source': field_file.name, 'sizes': sizes}
+
+
+def watch_image_fields(model, *field_names):
+    """Queue variant generation whenever one of the model's image fields gets a new original."""
+    IMAGE_VARIANT_FIELDS[model] = field_names
+    post_save.connect(_queue_image_variants, sender=model, dispatch_uid=f"image_variants_{model._meta.label}")
+
+
+def _queue_image_variants(sender, instance, raw=False, **kwargs):
+    from app.files.tasks import generate_image_variants
+
+    if raw:
+        return
+    for field_name in IMAGE_VARIANT_FIELDS[sender]:
+        if getattr(instance, field_name) and not has_current_variants(instance, field_name):
+            transaction.on_commit(partial(generate_image_variants.delay, sender._meta.label, instance.pk, field_name))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from app.files.images import IMAGE_VARIANT_FIELDS, get_variants_field_name
+from app.files.tasks import generate_image_variants
+
+
+class Command(BaseCommand):
+    help = """
+    Generate the resized variants of every image that doesn't have them yet, e.g. uploads from before the pipeline.
+
+    Queues one task per image, or runs them here with --sync. Images whose variants are current are skipped.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='Generate in this process instead of queueing')
+
+    def handle(self, *args, **options):
+        queued = 0
+        for model, field_names in IMAGE_VARIANT_FIELDS.items():
+            for field_name in field_names:
+                rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}) \
+                    .values_list('pk', field_name, get_variants_field_name(field_name))
+                for pk, name, variants in rows.iterator():
+                    if (variants or {}).get('source') == name:
+                        continue
+                    if options['sync']:
+                        generate_image_variants(model._meta.label, pk, field_name)
+                    else:
+                        generate_image_variants.delay(model._meta.label, pk, field_name)
+                    queued += 1
+        self.stdout.write(f"{'Generated' if options['sync'] else 'Queued'} variants for {queued} image(s)")
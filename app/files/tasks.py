@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.apps import apps
+
+from app.files.images import build_image_variants, get_variant_files, get_variants_field_name, has_current_variants
+from app.utils.cache import invalidate_cache
+
+
+@shared_task
+def generate_image_variants(model_label, pk, field_name):
+    """Resize one image into its variants (see app.files.images). Safe to re-run."""
+    model = apps.get_model(model_label)
+    variants_field_name = get_variants_field_name(field_name)
+    instance = model.objects.filter(pk=pk).only('pk', field_name, variants_field_name).first()
+    if instance is None or not getattr(instance, field_name) or has_current_variants(instance, field_name):
+        return 'Nothing to do'
+
+    previous = getattr(instance, variants_field_name)
+    variants = build_image_variants(getattr(instance, field_name))
+    # Keep them only if the original wasn't replaced meanwhile; the replacement queued a run of its own
+    updated = model.objects.filter(pk=pk, **{field_name: variants['source']}).update(**{variants_field_name: variants})
+    if not updated:
+        storage = getattr(instance, field_name).storage
+        for name in get_variant_files(variants):
+            storage.delete(name)
+        return 'Original replaced'
+
+    invalidate_cache(model)
+    storage = getattr(instance, field_name).storage
+    for name in set(get_variant_files(previous)) - set(get_variant_files(variants)):
+        storage.delete(name)
+    return f"Generated {len(get_variant_files(variants))} variants"
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from app.files.tasks import generate_image_variants
+from app.properties.models import PropertyImage
+from app.properties.serializers import PropertyImageSerializer
+from app.properties.tests import create_property_tree
+
+
+def make_image_file(size, mode='RGB', image_format='PNG'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128)[:len(mode)]).save(buffer, image_format)
+    return ContentFile(buffer.getvalue(), name=f"photo.{image_format.lower()}")
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        property = create_property_tree(0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.image = PropertyImage.objects.create(property=property, image=make_image_file((2400, 1200), 'RGBA'))
+        self.queued = [callback for callback in callbacks
+                       if getattr(callback, 'func', None) == generate_image_variants.delay]
+
+    def generate(self):
+        return generate_image_variants('properties.PropertyImage', self.image.pk, 'image')
+
+    def test_upload_queues_variants_after_commit(self):
+        self.assertEqual([('properties.PropertyImage', self.image.pk, 'image')], [c.args for c in self.queued])
+
+    def test_variants_are_resized_and_rendered_as_srcset(self):
+        self.generate()
+        self.image.refresh_from_db()
+        srcset = PropertyImageSerializer(self.image).data['image_srcset']
+
+        self.assertEqual(['thumb', 'card', 'full'], list(srcset))
+        self.assertEqual((240, 120), (srcset['thumb']['width'], srcset['thumb']['height']))
+        self.assertEqual(1600, srcset['full']['width'])
+        for size in self.image.image_variants['sizes'].values():
+            for name in size['files'].values():
+                with default_storage.open(name) as file, Image.open(file) as variant:
+                    self.assertEqual((size['width'], size['height']), variant.size)
+        self.assertTrue(srcset['card']['webp'].endswith('.card.webp'))
+
+    def test_rerun_is_a_no_op_and_replacing_the_original_regenerates(self):
+        self.generate()
+        self.image.refresh_from_db()
+        variants = self.image.image_variants
+        self.assertEqual('Nothing to do', self.generate())
+
+        self.image.image = make_image_file((100, 50), image_format='JPEG')
+        self.image.save()
+        self.generate()
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.image.name, self.image.image_variants['source'])
+        self.assertEqual(100, self.image.image_variants['sizes']['full']['width'])
+        # The first original's variants are cleaned up
+        self.assertFalse(default_storage.exists(variants['sizes']['thumb']['files']['webp']))
+        not_generated = PropertyImage(image='property_images/new.jpg')
+        self.assertEqual({}, PropertyImageSerializer(not_generated).data['image_srcset'])
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.properties'
+
+    def ready(self):
+        from app.files.images import watch_image_fields
+        from app.utils.cache import watch_models
+
+        watch_models(*self.get_models())
+        watch_image_fields(self.get_model('PropertyImage'), 'image')
+        watch_image_fields(self.get_model('UpdateImage'), 'image')
+        watch_image_fields(self.get_model('Amenity'), 'logo')
+        watch_image_fields(self.get_model('NearbyAttraction'), 'logo')
@@ -1,27 +1,78 @@
-from django.db import IntegrityError
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Value, When
 
-from app.utils.controllers import Controller
-from app.utils.helpers import get_serialized_exception
-from app.properties.models import Property, Plot, Phase, Update
+from app.properties.enums import AreaSizeUnit
+from app.properties.inventory import AREA_IN_SQ_FT, search_plots
+from app.utils.cache import invalidate_cache
+from app.utils.controllers import Controller, nest_query_plan
+from app.utils.helpers import get_serialized_exception, pack_bitmap
+from app.properties.models import Property, PropertyImage, Plot, Phase, Update, Amenity, available_plots, \
+    get_image_sort_key_expression
 
 
 class UpdateController(Controller):
+    select_related = ('posted_by__director',)
+    prefetch_related = ('images',)
+
     def __init__(self):
         self.model = Update
 
     def filter(self, **filters):
-        instance_qs = self.model.objects.all().order_by('-posted_by')
+        instance_qs = self.get_list_queryset().order_by('-posted_by')
         return None, instance_qs
 
 
+# Text search configuration of the trigger-maintained Property.search_vector (migration 0026).
+SEARCH_CONFIG = 'english'
+
+
 class PropertyController(Controller):
+    select_related = ('created_by__director', 'director__director', 'current_lead__user__director')
+    prefetch_related = ('images', 'amenities', 'nearby_attractions', 'current_lead__favorites')
+
+    defer_fields = ('search_vector',)
+
     def __init__(self):
         self.model = Property
 
+    def search(self, query):
+        """
+        Available properties matching a normalized `query`, best match first. Uses the stored search vector on
+        PostgreSQL; other databases (local development) fall back to requiring every word in one of the fields.
+        """
+        queryset = Property.objects.filter(Exists(available_plots(phase__property=OuterRef('pk')))) \
+            .defer(*self.defer_fields)
+        if connection.vendor == 'postgresql':
+            search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+            return queryset.filter(search_vector=search_query) \
+                .annotate(rank=SearchRank(F('search_vector'), search_query)).order_by('-rank', 'pk')
+
+        for word in query.split():
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(location__icontains=word) | Q(description__icontains=word) |
+                Exists(Amenity.objects.filter(property=OuterRef('pk'), name__icontains=word))
+            )
+        return queryset.order_by('pk')
+
+    def reorder_images(self, property_id, image_ids):
+        """
+        Give the listed images of a property `slider_image_order` 0, 1, 2... in list order, in one UPDATE.
+        Slider images still come before the others; images left out keep their order.
+        """
+        images = PropertyImage.objects.filter(property_id=property_id, pk__in=image_ids)
+        order = Case(*[When(pk=image_id, then=Value(position)) for position, image_id in enumerate(image_ids)])
+        with transaction.atomic(savepoint=False):
+            if len(images.select_for_update().values_list('pk', flat=True)) != len(image_ids):
+                return {'error_message': "Every image must belong to the property"}, None
+            updated = images.update(slider_image_order=order, sort_key=get_image_sort_key_expression(order))
+            invalidate_cache(PropertyImage)
+        return None, updated
+
     def filter(self, **filters):
-        properties_queryset = self.model.objects.filter(
-            phases__plots__is_booked=False
-        ).distinct()
+        properties_queryset = self.get_list_queryset().filter(
+            Exists(available_plots(phase__property=OuterRef('pk')))
+        )
         for attr, value in filters.items():
             if value is not None:
                 properties_queryset = properties_queryset.filter(**{attr: value})
@@ -29,25 +80,120 @@ class PropertyController(Controller):
 
 
 class PhaseController(Controller):
+    select_related = ('property',) + nest_query_plan('property', PropertyController.select_related)
+    prefetch_related = nest_query_plan('property', PropertyController.prefetch_related)
+    plot_map_columns = ('id', 'plot_number', 'price', 'area_size', 'area_size_unit', 'is_booked', 'is_sold')
+
     def __init__(self):
         self.model = Phase
 
     def filter(self, **filters):
-        phases_queryset = self.model.objects.filter(
-            plots__is_booked=False
-        ).distinct()
+        phases_queryset = self.get_list_queryset().filter(
+            Exists(available_plots(phase=OuterRef('pk')))
+        )
         for attr, value in filters.items():
             if value is not None:
                 phases_queryset = phases_queryset.filter(**{attr: value})
         return None, phases_queryset
 
+    def get_plot_map(self, phase_id, whole_property=False):
+        """
+        Status map of the phase's plots, or of every phase of its property, as parallel columns ordered by
+        plot number; None when the phase does not exist. One query for a phase, three for a property.
+        """
+        if whole_property:
+            property_ids = list(Phase.objects.filter(pk=phase_id).values_list('property_id', flat=True))
+            if not property_ids:
+                return None
+            if property_ids[0] is not None:
+                return self.get_property_plot_map(property_ids[0])
+
+        rows = list(Plot.objects.filter(phase_id=phase_id).order_by('plot_number', 'pk')
+                    .values_list(*self.plot_map_columns))
+        if not rows and not Phase.objects.filter(pk=phase_id).exists():
+            return None
+        return {'phases': [{'phase_id': int(phase_id), **get_plot_map_columns(rows)}]}
+
+    def get_property_plot_map(self, property_id):
+        phases = Phase.objects.filter(property_id=property_id).order_by('phase_number', 'pk') \
+            .values_list('id', 'phase_number')
+        rows_by_phase = {}
+        plots = Plot.objects.filter(phase__property_id=property_id).order_by('plot_number', 'pk') \
+            .values_list('phase_id', *self.plot_map_columns)
+        for phase_id, *row in plots:
+            rows_by_phase.setdefault(phase_id, []).append(row)
+        return {
+            'property_id': property_id,
+            'phases': [{'phase_id': phase_id, 'phase_number': phase_number,
+                        **get_plot_map_columns(rows_by_phase.get(phase_id, []))}
+                       for phase_id, phase_number in phases],
+        }
+
+
+def get_plot_map_columns(rows):
+    """`PhaseController.plot_map_columns` rows as parallel arrays, with booked/sold packed by `pack_bitmap`."""
+    ids, plot_numbers, prices, area_sizes, area_size_units, booked, sold = zip(*rows) if rows else ((),) * 7
+    return {
+        'count': len(rows),
+        'ids': list(ids),
+        'plot_numbers': list(plot_numbers),
+        'prices': [None if price is None else float(price) for price in prices],
+        'area_sizes': [None if area_size is None else float(area_size) for area_size in area_sizes],
+        'area_size_units': list(area_size_units),
+        'booked': pack_bitmap(booked),
+        'sold': pack_bitmap(sold),
+    }
+
 
 class PlotController(Controller):
+    # Columns the phase aggregates are computed from, see Phase.refresh_plot_aggregates.
+    aggregated_fields = {'phase_id', 'is_booked', 'price', 'area_size', 'area_size_unit'}
+
     def __init__(self):
         self.model = Plot
 
+    def faceted_search(self, area_size_unit=AreaSizeUnit.SQ_FT, **filters):
+        """(ids of matching unbooked plots, cheapest first, facet counts); see app.properties.inventory."""
+        factor = AREA_IN_SQ_FT[area_size_unit]
+        for bound in ('area_min', 'area_max'):
+            if filters.get(bound) is not None:
+                filters[bound] *= factor
+        return search_plots(filters)
+
+    def has_write_side_effects(self):
+        # Writes stay single statements; the touched phases are refreshed once afterwards.
+        return False
+
+    def edit(self, instance_id, **kwargs):
+        if not self.aggregated_fields & self.get_changes(kwargs).keys():
+            return super().edit(instance_id, **kwargs)
+        with transaction.atomic(savepoint=False):
+            phase_ids = set(Plot.objects.filter(pk=instance_id).values_list('phase_id', flat=True))
+            error, instance = super().edit(instance_id, **kwargs)
+            if not error:
+                Phase.refresh_plot_aggregates((phase_ids | {kwargs.get('phase_id')}) - {None})
+        return error, instance
+
+    def bulk_create(self, items, batch_size=500):
+        with transaction.atomic(savepoint=False):
+            errors, instances = super().bulk_create(items, batch_size=batch_size)
+            if instances:
+                Phase.refresh_plot_aggregates({instance.phase_id for instance in instances} - {None})
+        return errors, instances
+
+    def bulk_edit(self, changes_by_pk, batch_size=500):
+        if not any(self.aggregated_fields & self.get_changes(kwargs).keys() for kwargs in changes_by_pk.values()):
+            return super().bulk_edit(changes_by_pk, batch_size=batch_size)
+        with transaction.atomic(savepoint=False):
+            phase_ids = set(Plot.objects.filter(pk__in=changes_by_pk).values_list('phase_id', flat=True))
+            errors, pks = super().bulk_edit(changes_by_pk, batch_size=batch_size)
+            if pks:
+                phase_ids.update(kwargs.get('phase_id') for kwargs in changes_by_pk.values())
+                Phase.refresh_plot_aggregates(phase_ids - {None})
+        return errors, pks
+
     def filter(self, **filters):
-        plots_queryset = self.model.objects.filter(
+        plots_queryset = self.get_list_queryset().filter(
             is_booked=False
         ).distinct()
         for attr, value in filters.items():
@@ -0,0 +1,85 @@
+"""
+Short-lived plot holds: a sales officer keeps a plot for a buyer between the site visit and the token payment.
+
+A hold is one cache key per plot, taken with `cache.add` (SET NX PX on Redis): the first taker wins and the key
+expires by itself, so nothing is written to the Plot row. Listings read the holds of a whole page with one
+`cache.get_many` (MGET). Taking or releasing a hold bumps the `HOLDS_LABEL` generation, which listing ETags include.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from app.utils.cache import bump_cache_version
+from app.utils.constants import CacheKeys
+from app.utils.helpers import build_cache_key
+
+# Generation label for holds, in place of a model (see app.utils.cache.get_model_label)
+HOLDS_LABEL = 'properties.plothold'
+
+# Compare-and-delete: a hold read as ours may expire and be taken by someone else before the DEL.
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def get_hold_key(plot_id):
+    return build_cache_key(CacheKeys.PLOT_HOLD, pk=plot_id)
+
+
+def hold_plot(plot_id, user_id, timeout):
+    """(created, hold): the hold now on the plot, which belongs to someone else when they got there first."""
+    hold = {
+        'plot_id': int(plot_id),
+        'held_by': user_id,
+        'expires_at': (timezone.now() + timedelta(seconds=timeout)).isoformat(),
+    }
+    if cache.add(get_hold_key(plot_id), hold, timeout=timeout):
+        bump_cache_version(HOLDS_LABEL)
+        return True, hold
+    current = cache.get(get_hold_key(plot_id))
+    if current is None:
+        # Expired between the two calls: try once more
+        return hold_plot(plot_id, user_id, timeout)
+    return False, current
+
+
+def release_plot_hold(plot_id, user_id):
+    """Drop the user's hold on the plot. False when the plot is held by someone else."""
+    key = get_hold_key(plot_id)
+    client = getattr(cache, 'client', None)
+    if not hasattr(client, 'decode'):
+        hold = cache.get(key)
+        if hold is None:
+            return True
+        if hold['held_by'] != user_id:
+            return False
+        cache.delete(key)
+    else:  # django_redis
+        # Compare the stored bytes as read, not a re-encoding of the hold, which need not round-trip byte for byte
+        redis = client.get_client(write=True)
+        raw = redis.get(cache.make_key(key))
+        if raw is None:
+            return True
+        if client.decode(raw)['held_by'] != user_id:
+            return False
+        if not redis.eval(RELEASE_SCRIPT, 1, cache.make_key(key), raw):
+            # Expired and possibly taken by someone else since the GET: look again
+            return release_plot_hold(plot_id, user_id)
+    bump_cache_version(HOLDS_LABEL)
+    return True
+
+
+def get_plot_holds(plot_ids):
+    """Current holds of the given plots by plot id, in one round trip."""
+    keys = {get_hold_key(plot_id): plot_id for plot_id in plot_ids}
+    return {keys[key]: hold for key, hold in cache.get_many(list(keys)).items()}
+
+
+def with_plot_holds(rows):
+    """Copies of serialized plot rows with their current `hold` (null when free)."""
+    holds = get_plot_holds([row['id'] for row in rows if 'id' in row])
+    return [{**row, 'hold': holds.get(row.get('id'))} for row in rows]
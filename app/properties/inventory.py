@@ -0,0 +1,216 @@
+"""
+Faceted plot search over a per-worker, column-oriented snapshot of unbooked plots.
+
+Every column is a NumPy array indexed by row, so a search is a handful of vectorized comparisons and
+`bincount`s instead of a query. The snapshot follows Plot writes incrementally: when the Plot cache generation
+moves, rows with a newer `updated_at` are merged in, and a count check (or `PLOT_INVENTORY_MAX_AGE`) triggers a
+full reload for anything that can't be seen that way, such as deletes.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Case, Count, DecimalField, F, Max, Q, Value, When
+from django.utils import timezone
+
+from app.properties.enums import AreaSizeUnit
+from app.properties.models import Plot, available_plots
+from app.utils.cache import get_cache_version
+
+logger = logging.getLogger(__name__)
+
+AREA_IN_SQ_FT = {
+    AreaSizeUnit.SQ_FT: 1.0,
+    AreaSizeUnit.YARDS: 9.0,
+    AreaSizeUnit.ACRES: 43560.0,
+    AreaSizeUnit.GUNTALU: 1089.0,
+    AreaSizeUnit.CENTS: 435.6,
+    AreaSizeUnit.ANKANALU: 72.0,
+}
+
+# Columns counted per value. Enum facets are filtered by value lists, `is_corner_site` by a boolean
+# (a missing flag counts as not a corner site).
+FACETS = ('facing', 'soil_type', 'availability', 'is_corner_site')
+
+# Rows committed after a refresh with an older updated_at are picked up by re-reading this far back.
+SYNC_OVERLAP = timedelta(minutes=2)
+
+COLUMNS = ('id', 'phase_id', 'phase__property_id', 'price', 'area_size', 'area_size_unit', *FACETS)
+
+
+def get_area_in_sq_ft(area_size, area_size_unit):
+    factor = AREA_IN_SQ_FT.get(area_size_unit)
+    if area_size is None or factor is None:
+        return np.nan
+    return float(area_size) * factor
+
+
+class InventorySnapshot:
+    """Immutable set of column arrays; refreshes build a new snapshot and swap it in."""
+
+    def __init__(self, columns, generation, synced_at, loaded_at):
+        self.columns = columns
+        self.rows = {plot_id: row for row, plot_id in enumerate(columns['id'].tolist()) if columns['live'][row]}
+        self.generation = generation
+        self.synced_at = synced_at
+        self.loaded_at = loaded_at
+
+    @staticmethod
+    def to_columns(values):
+        """Column arrays from `COLUMNS` value tuples; missing enums become 0 and missing numbers NaN."""
+        return {
+            'id': np.array([row[0] for row in values], dtype=np.int64),
+            'phase_id': np.array([row[1] or 0 for row in values], dtype=np.int64),
+            'property_id': np.array([row[2] or 0 for row in values], dtype=np.int64),
+            'price': np.array([np.nan if row[3] is None else float(row[3]) for row in values], dtype=np.float64),
+            'area': np.array([get_area_in_sq_ft(row[4], row[5]) for row in values], dtype=np.float64),
+            **{facet: np.array([int(row[6 + n] or 0) for row in values], dtype=np.int16)
+               for n, facet in enumerate(FACETS)},
+            'live': np.ones(len(values), dtype=bool),
+        }
+
+    def merge(self, changes, generation, synced_at):
+        """New snapshot with `changes` (value tuples with an extra trailing is_booked) applied."""
+        columns = {name: array.copy() for name, array in self.columns.items()}
+        appended = []
+        for values in changes:
+            row = self.rows.get(values[0])
+            if values[-1]:  # booked: drop it
+                if row is not None:
+                    columns['live'][row] = False
+            elif row is None:
+                appended.append(values[:-1])
+            else:
+                for name, array in self.to_columns([values[:-1]]).items():
+                    columns[name][row] = array[0]
+        if appended:
+            new = self.to_columns(appended)
+            columns = {name: np.concatenate((columns[name], new[name])) for name in columns}
+        if (~columns['live']).sum() > len(columns['live']) // 4:
+            columns = {name: array[columns['live']] for name, array in columns.items()}
+        return InventorySnapshot(columns, generation, synced_at, self.loaded_at)
+
+    def search(self, filters):
+        columns = self.columns
+        base = columns['live'].copy()
+        for column, low, high in (('price', 'price_min', 'price_max'), ('area', 'area_min', 'area_max')):
+            if filters.get(low) is not None:
+                base &= columns[column] >= filters[low]
+            if filters.get(high) is not None:
+                base &= columns[column] <= filters[high]
+        for column in ('phase_id', 'property_id'):
+            if filters.get(column) is not None:
+                base &= columns[column] == filters[column]
+
+        facet_masks = {facet: np.isin(columns[facet], [int(value) for value in filters[facet]])
+                       for facet in FACETS[:-1] if filters.get(facet)}
+        if filters.get('is_corner_site') is not None:
+            facet_masks['is_corner_site'] = columns['is_corner_site'] == int(filters['is_corner_site'])
+        facets = {}
+        for facet in FACETS:
+            mask = base.copy()
+            for other, other_mask in facet_masks.items():
+                if other != facet:
+                    mask &= other_mask
+            counts = np.bincount(columns[facet][mask])
+            facets[facet] = {int(value): int(counts[value]) for value in np.flatnonzero(counts) if value}
+            if facet == 'is_corner_site':
+                facets[facet] = {'true': facets[facet].get(1, 0), 'false': int(mask.sum()) - facets[facet].get(1, 0)}
+
+        match = base
+        for mask in facet_masks.values():
+            match &= mask
+        ids, prices = columns['id'][match], columns['price'][match]
+        # Cheapest first, plots without a price last
+        order = np.lexsort((ids, np.where(np.isnan(prices), np.inf, prices)))
+        return ids[order].tolist(), facets
+
+
+class PlotInventory:
+    def __init__(self):
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    def get_snapshot(self):
+        generation = get_cache_version((Plot,))
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.generation == generation and \
+                time.monotonic() - snapshot.loaded_at < settings.PLOT_INVENTORY_MAX_AGE:
+            return snapshot
+        with self._lock:
+            if self.snapshot is snapshot:
+                self.snapshot = self.refresh(snapshot, generation)
+            return self.snapshot
+
+    @staticmethod
+    def refresh(snapshot, generation):
+        synced_at = Plot.objects.aggregate(synced_at=Max('updated_at'))['synced_at'] or timezone.now()
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < settings.PLOT_INVENTORY_MAX_AGE:
+            changes = Plot.objects.filter(updated_at__gte=snapshot.synced_at - SYNC_OVERLAP) \
+                .values_list(*COLUMNS, 'is_booked')
+            merged = snapshot.merge(changes, generation, synced_at)
+            if len(merged.rows) == available_plots().count():
+                return merged
+            logger.info("Plot inventory out of step after an incremental refresh, reloading")
+
+        values = available_plots().values_list(*COLUMNS)
+        return InventorySnapshot(InventorySnapshot.to_columns(list(values)), generation, synced_at, time.monotonic())
+
+    def search(self, filters):
+        return self.get_snapshot().search(filters)
+
+    def clear(self):
+        self.snapshot = None
+
+
+plot_inventory = PlotInventory()
+
+
+def search_plots_in_db(filters):
+    """Same search as `PlotInventory.search`, as queries: one for the ids and one per facet."""
+    queryset = available_plots().annotate(area_sq_ft=Case(
+        *[When(area_size_unit=unit, then=F('area_size') * Value(Decimal(str(factor))))
+          for unit, factor in AREA_IN_SQ_FT.items()],
+        output_field=DecimalField(),
+    ))
+    for column, low, high in (('price', 'price_min', 'price_max'), ('area_sq_ft', 'area_min', 'area_max')):
+        if filters.get(low) is not None:
+            queryset = queryset.filter(**{f'{column}__gte': filters[low]})
+        if filters.get(high) is not None:
+            queryset = queryset.filter(**{f'{column}__lte': filters[high]})
+    if filters.get('phase_id') is not None:
+        queryset = queryset.filter(phase_id=filters['phase_id'])
+    if filters.get('property_id') is not None:
+        queryset = queryset.filter(phase__property_id=filters['property_id'])
+
+    facet_filters = {facet: Q(**{f'{facet}__in': filters[facet]}) for facet in FACETS[:-1] if filters.get(facet)}
+    if filters.get('is_corner_site') is not None:
+        corner = Q(is_corner_site=True)
+        facet_filters['is_corner_site'] = corner if filters['is_corner_site'] else ~corner
+    facets = {}
+    for facet in FACETS:
+        facet_queryset = queryset
+        for other, lookup in facet_filters.items():
+            if other != facet:
+                facet_queryset = facet_queryset.filter(lookup)
+        counts = dict(facet_queryset.order_by().values_list(facet).annotate(count=Count('pk')))
+        if facet == 'is_corner_site':
+            facets[facet] = {'true': counts.get(True, 0), 'false': sum(counts.values()) - counts.get(True, 0)}
+        else:
+            facets[facet] = {value: counts[value] for value in sorted(filter(None, counts))}
+
+    for lookup in facet_filters.values():
+        queryset = queryset.filter(lookup)
+    ids = queryset.order_by(F('price').asc(nulls_last=True), 'pk').values_list('pk', flat=True)
+    return list(ids), facets
+
+
+def search_plots(filters):
+    """(plot ids cheapest first, facet counts) for the faceted search filters."""
+    if settings.PLOT_INVENTORY_ENABLED:
+        return plot_inventory.search(filters)
+    return search_plots_in_db(filters)
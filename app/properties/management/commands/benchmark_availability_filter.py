@@ -0,0 +1,66 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot, available_plots
+
+
+class Command(BaseCommand):
+    help = """
+    Compare the property/phase availability filters: JOIN + DISTINCT against correlated EXISTS.
+
+    Seeds a synthetic layout (100k plots by default) inside a transaction that is rolled back at the end,
+    so it can be pointed at a development database. Prints the median time of each query shape.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plots', type=int, default=100_000)
+        parser.add_argument('--plots-per-phase', type=int, default=200)
+        parser.add_argument('--phases-per-property', type=int, default=4)
+        parser.add_argument('--booked-ratio', type=float, default=0.8, help='Share of plots already booked')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Plot._meta.db_table}" if connection.vendor == 'postgresql' else "ANALYZE")
+
+            shapes = {
+                'property join+distinct': Property.objects.filter(phases__plots__is_booked=False).distinct(),
+                'property exists': Property.objects.filter(Exists(available_plots(phase__property=OuterRef('pk')))),
+                'phase join+distinct': Phase.objects.filter(plots__is_booked=False).distinct(),
+                'phase exists': Phase.objects.filter(Exists(available_plots(phase=OuterRef('pk')))),
+            }
+            for name, queryset in shapes.items():
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    rows = len(list(queryset.values_list('pk', flat=True)))
+                    timings.append(time.perf_counter() - start)
+                self.stdout.write(f"{name:<26} {statistics.median(timings) * 1000:9.1f} ms  ({rows} rows)")
+
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        plots_per_phase = options['plots_per_phase']
+        phase_count = max(1, options['plots'] // plots_per_phase)
+        property_count = max(1, phase_count // options['phases_per_property'])
+        booked_every = round(1 / (1 - options['booked_ratio'])) if options['booked_ratio'] < 1 else 0
+
+        properties = Property.objects.bulk_create(
+            [Property(property_type=PropertyType.DTCP_PLOTS, name=f"Benchmark {n}") for n in range(property_count)])
+        phases = Phase.objects.bulk_create(
+            [Phase(property=properties[n % property_count], phase_number=n) for n in range(phase_count)])
+        Plot.objects.bulk_create(
+            (Plot(phase=phase, plot_number=n, price=1000, area_size=1200,
+                  is_booked=not booked_every or n % booked_every != 0)
+             for phase in phases for n in range(plots_per_phase)),
+            batch_size=5000,
+        )
+        self.stdout.write(f"Seeded {property_count} properties, {phase_count} phases, "
+                          f"{phase_count * plots_per_phase} plots")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from app.properties.models import Phase
+
+
+class Command(BaseCommand):
+    help = """
+    Recompute the plot aggregates stored on phases (available plot count, minimum price and area, area unit).
+
+    Plot writes keep them in sync; run this after writing plots with raw SQL or queryset.update().
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('phase_ids', nargs='*', type=int, help='Phases to refresh (default: all)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Phases updated per statement')
+
+    def handle(self, *args, **options):
+        phase_ids = options['phase_ids'] or list(Phase.objects.order_by('pk').values_list('pk', flat=True))
+        batch_size = options['batch_size']
+
+        updated = 0
+        for start in range(0, len(phase_ids), batch_size):
+            updated += Phase.refresh_plot_aggregates(phase_ids[start:start + batch_size])
+        self.stdout.write(f"Refreshed plot aggregates of {updated} phase(s)")
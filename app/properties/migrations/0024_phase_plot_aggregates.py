@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:27
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_plot_aggregates(apps, schema_editor):
+    Phase = apps.get_model('properties', 'Phase')
+    Plot = apps.get_model('properties', 'Plot')
+    available = Plot.objects.filter(phase=OuterRef('pk'), is_booked=False).order_by().values('phase')
+    Phase.objects.update(
+        available_plot_count=Coalesce(Subquery(available.annotate(count=Count('pk')).values('count')), 0),
+        min_price=Subquery(available.annotate(price=Min('price')).values('price')),
+        min_area_size=Subquery(available.annotate(area_size=Min('area_size')).values('area_size')),
+        area_size_unit=Subquery(Plot.objects.filter(phase=OuterRef('pk')).order_by('pk').values('area_size_unit')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0023_auto_20240527_1447'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='phase',
+            name='area_size_unit',
+            field=models.IntegerField(blank=True, choices=[(1, 'Sq Ft'), (2, 'Yards'), (3, 'Acres'), (4, 'Guntalu'), (5, 'Cents'), (6, 'Ankanalu')], editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='phase',
+            name='available_plot_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='phase',
+            name='min_area_size',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='phase',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(fill_plot_aggregates, migrations.RunPython.noop),
+    ]
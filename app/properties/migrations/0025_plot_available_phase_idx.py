@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0024_phase_plot_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plot',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['phase'], name='plot_available_phase_idx'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:33
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keep in sync with app.properties.controllers.SEARCH_CONFIG.
+CREATE_SEARCH_TRIGGERS = """
+CREATE OR REPLACE FUNCTION properties_property_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(amenity.name, ' ')
+            FROM properties_amenity amenity
+            JOIN properties_property_amenities link ON link.amenity_id = amenity.id
+            WHERE link.property_id = NEW.id
+        ), '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_property_search_vector
+    BEFORE INSERT OR UPDATE OF name, location, description, search_vector ON properties_property
+    FOR EACH ROW EXECUTE PROCEDURE properties_property_search_vector();
+
+-- Amenities are linked and renamed without touching the property row: reset its vector to recompute it.
+CREATE OR REPLACE FUNCTION properties_property_amenities_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'properties_amenity' THEN
+        UPDATE properties_property SET search_vector = NULL
+        WHERE id IN (SELECT property_id FROM properties_property_amenities WHERE amenity_id = NEW.id);
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE properties_property SET search_vector = NULL WHERE id = OLD.property_id;
+    ELSE
+        UPDATE properties_property SET search_vector = NULL WHERE id = NEW.property_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_property_amenities_search_vector
+    AFTER INSERT OR UPDATE OR DELETE ON properties_property_amenities
+    FOR EACH ROW EXECUTE PROCEDURE properties_property_amenities_search_vector();
+
+CREATE TRIGGER properties_amenity_search_vector
+    AFTER UPDATE OF name ON properties_amenity
+    FOR EACH ROW EXECUTE PROCEDURE properties_property_amenities_search_vector();
+
+CREATE INDEX properties_property_search_vector_idx ON properties_property USING gin (search_vector);
+
+UPDATE properties_property SET search_vector = NULL;
+"""
+
+DROP_SEARCH_TRIGGERS = """
+DROP INDEX IF EXISTS properties_property_search_vector_idx;
+DROP TRIGGER IF EXISTS properties_amenity_search_vector ON properties_amenity;
+DROP TRIGGER IF EXISTS properties_property_amenities_search_vector ON properties_property_amenities;
+DROP TRIGGER IF EXISTS properties_property_search_vector ON properties_property;
+DROP FUNCTION IF EXISTS properties_property_amenities_search_vector();
+DROP FUNCTION IF EXISTS properties_property_search_vector();
+"""
+
+
+def create_search_triggers(apps, schema_editor):
+    # Full-text search is PostgreSQL only; elsewhere PropertyController.search falls back to plain lookups.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_TRIGGERS)
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0025_plot_available_phase_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
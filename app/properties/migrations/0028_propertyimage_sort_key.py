@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:44
+
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce
+
+# Same encoding as app.properties.models.get_image_sort_key
+IMAGE_SORT_GROUP = 1 << 32
+IMAGE_SORT_OFFSET = 1 << 31
+
+
+def fill_sort_key(apps, schema_editor):
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+    PropertyImage.objects.update(
+        sort_key=Case(When(is_slider_image=True, then=Value(0)), default=Value(IMAGE_SORT_GROUP)) +
+        Coalesce(F('slider_image_order') + Value(IMAGE_SORT_OFFSET), Value(IMAGE_SORT_GROUP - 1)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0027_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='propertyimage',
+            options={'ordering': ['sort_key', 'pk'], 'verbose_name': 'Property Image', 'verbose_name_plural': 'Property Images'},
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='sort_key',
+            field=models.BigIntegerField(default=8589934591, editable=False),
+        ),
+        migrations.RunPython(fill_sort_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(fields=['property', 'sort_key'], name='propertyimage_sort_idx'),
+        ),
+    ]
@@ -1,11 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from django.db.models import JSONField, Case, When, Value
+from django.db import models, transaction
+from django.db.models import JSONField, Case, When, Value, Count, Min, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 from app.properties.enums import Facing, SoilType
 from app.properties.enums import Availability, PropertyType, AreaSizeUnit, AreaOfPurpose, PhaseStatus
+from app.utils.cache import invalidate_cache
 
 User = get_user_model()
 
@@ -23,6 +26,7 @@ class Update(models.Model):
 class UpdateImage(models.Model):
     update = models.ForeignKey(Update, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='update_images/')
+    image_variants = models.JSONField(blank=True, null=True, editable=False)  # see app.files.images
 
     def __str__(self):
         return f"Image for {self.update.title}"
@@ -31,6 +35,7 @@ class UpdateImage(models.Model):
 class Amenity(models.Model):
     name = models.CharField(max_length=255)
     logo = models.ImageField(upload_to='amenities_logos/', blank=True, null=True)  # Image file
+    logo_variants = models.JSONField(blank=True, null=True, editable=False)  # see app.files.images
 
     def __str__(self):
         return self.name
@@ -39,6 +44,7 @@ class Amenity(models.Model):
 class NearbyAttraction(models.Model):
     name = models.CharField(max_length=255)
     logo = models.ImageField(upload_to='attractions_logos/', blank=True, null=True)  # Image file
+    logo_variants = models.JSONField(blank=True, null=True, editable=False)  # see app.files.images
 
     def __str__(self):
         return self.name
@@ -64,28 +70,48 @@ class Property(models.Model):
                                      related_name="properties")
     amenities = models.ManyToManyField(Amenity, blank=True)
     nearby_attractions = models.ManyToManyField(NearbyAttraction, blank=True)
+    # Weighted name/location/description/amenity names, maintained by database triggers on PostgreSQL
+    # (migration 0026) and GIN-indexed there.
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
 
     def __str__(self):
         return f"{self.id} ({self.name})"
 
 
+# PropertyImage.sort_key: slider images first, each group by slider_image_order with unordered images last.
+IMAGE_SORT_GROUP = 1 << 32
+IMAGE_SORT_OFFSET = 1 << 31  # makes any IntegerField order non-negative
+IMAGE_SORT_UNORDERED = IMAGE_SORT_GROUP - 1
+
+
+def get_image_sort_key(is_slider_image, slider_image_order):
+    order = IMAGE_SORT_UNORDERED if slider_image_order is None else slider_image_order + IMAGE_SORT_OFFSET
+    return (0 if is_slider_image else IMAGE_SORT_GROUP) + order
+
+
+def get_image_sort_key_expression(order):
+    """`get_image_sort_key` as an SQL expression over `is_slider_image` and the `order` expression, for updates."""
+    return Case(When(is_slider_image=True, then=Value(0)), default=Value(IMAGE_SORT_GROUP)) + \
+        Coalesce(order + Value(IMAGE_SORT_OFFSET), Value(IMAGE_SORT_UNORDERED))
+
+
 class PropertyImage(models.Model):
     property = models.ForeignKey('Property', related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='property_images/')
+    image_variants = models.JSONField(blank=True, null=True, editable=False)  # see app.files.images
     is_slider_image = models.BooleanField(default=False, blank=True, null=True, verbose_name='Use as slider image')
     is_thumbnail = models.BooleanField(default=False, blank=True, null=True, verbose_name='Use as Home screen image')
     slider_image_order = models.IntegerField(blank=True, null=True, verbose_name='Slider Image Order')
+    # Maintained by save() and PropertyController.reorder_images, see get_image_sort_key
+    sort_key = models.BigIntegerField(default=get_image_sort_key(False, None), editable=False)
 
     class Meta:
         verbose_name = 'Property Image'
         verbose_name_plural = 'Property Images'
-        ordering = [
-            Case(
-                When(is_slider_image=True, then=Value(0)),
-                default=Value(1),
-                output_field=models.IntegerField(),
-            ),
-            'slider_image_order',  # This sorts slider images by their order
+        ordering = ['sort_key', 'pk']
+        indexes = [
+            # A property's images in display order (the `images` prefetch) straight from the index
+            models.Index(fields=['property', 'sort_key'], name='propertyimage_sort_idx'),
         ]
 
     def __str__(self):
@@ -100,17 +126,10 @@ class PropertyImage(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
-
-    def clean(self):
-        """
-        Ensure that if is_slider_image is True, then slider_image_order is not None.
-        """
-        if self.is_slider_image and self.slider_image_order is None:
-            raise ValidationError("Slider image order must be provided if the image is used as a slider image.")
-
-    def save(self, *args, **kwargs):
-        self.clean()
+        self.sort_key = get_image_sort_key(self.is_slider_image, self.slider_image_order)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'is_slider_image', 'slider_image_order'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'sort_key'}
         super().save(*args, **kwargs)
 
 
@@ -140,9 +159,39 @@ class Phase(models.Model):
     status = models.IntegerField(choices=PhaseStatus.choices, default=PhaseStatus.NOT_COMPLETED, blank=True,
                                  null=True)
 
+    # Aggregates over the phase's plots, kept in sync by Plot writes (see refresh_plot_aggregates).
+    available_plot_count = models.PositiveIntegerField(default=0, editable=False)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, editable=False)
+    min_area_size = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, editable=False)
+    area_size_unit = models.IntegerField(choices=AreaSizeUnit.choices, blank=True, null=True, editable=False)
+
     def __str__(self):
         return f"Phase - {self.phase_number} -- {self.property.name} Image"
 
+    @classmethod
+    def refresh_plot_aggregates(cls, phase_ids=None):
+        """
+        Recompute the plot aggregates of the given phases (all when None) in one UPDATE.
+        Run it in the transaction that wrote the plots. The phase rows are locked first, so the UPDATE also sees
+        plot writes committed by a concurrent transaction that held those locks before us.
+        """
+        if phase_ids is not None and not phase_ids:
+            return 0
+        phases = cls.objects.all() if phase_ids is None else cls.objects.filter(pk__in=phase_ids)
+        with transaction.atomic(savepoint=False):
+            list(phases.select_for_update().order_by('pk').values_list('pk', flat=True))
+            available = available_plots(phase=OuterRef('pk')).order_by().values('phase')
+            updated = phases.update(
+                available_plot_count=Coalesce(Subquery(available.annotate(count=Count('pk')).values('count')), 0),
+                min_price=Subquery(available.annotate(price=Min('price')).values('price')),
+                min_area_size=Subquery(available.annotate(area_size=Min('area_size')).values('area_size')),
+                # The unit of the phase's first plot, booked or not
+                area_size_unit=Subquery(
+                    Plot.objects.filter(phase=OuterRef('pk')).order_by('pk').values('area_size_unit')[:1]),
+            )
+        invalidate_cache(cls)
+        return updated
+
 
 class Plot(models.Model):
     phase = models.ForeignKey("properties.Phase", on_delete=models.CASCADE, blank=True, null=True, related_name="plots")
@@ -161,5 +210,42 @@ class Plot(models.Model):
     is_booked = models.BooleanField(default=False, blank=True, null=True)
     is_sold = models.BooleanField(default=False, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Availability checks (see available_plots) only ever look for unbooked plots of a phase
+            models.Index(fields=['phase'], condition=Q(is_booked=False), name='plot_available_phase_idx'),
+        ]
+
     def __str__(self):
         return f"{self.phase.property.name} Phase - {self.phase.phase_number} Plot - {self.plot_number}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded phase so moving a plot also refreshes the phase it left.
+        instance._loaded_phase_id = instance.__dict__.get('phase_id')
+        return instance
+
+    def get_affected_phase_ids(self):
+        return {phase_id for phase_id in (self.phase_id, getattr(self, '_loaded_phase_id', None)) if phase_id}
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            Phase.refresh_plot_aggregates(self.get_affected_phase_ids())
+        self._loaded_phase_id = self.phase_id
+
+    def delete(self, *args, **kwargs):
+        phase_ids = self.get_affected_phase_ids()
+        with transaction.atomic(savepoint=False):
+            result = super().delete(*args, **kwargs)
+            Phase.refresh_plot_aggregates(phase_ids)
+        return result
+
+
+def available_plots(**lookups):
+    """
+    Unbooked plots matching `lookups`. Filter parents with `Exists(available_plots(phase=OuterRef('pk')))` rather
+    than joining plots and calling distinct(); the partial index on unbooked plots answers each probe.
+    """
+    return Plot.objects.filter(is_booked=False, **lookups)
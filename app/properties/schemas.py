@@ -1,6 +1,7 @@
 import json
 
 from _decimal import Decimal
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from pydantic.v1 import BaseModel, validator, condecimal, constr, Field, HttpUrl
 from typing import Optional, List, Dict, Any
@@ -10,7 +11,8 @@ from app.properties.enums import Facing, SoilType
 from app.properties.enums import PropertyType, AreaSizeUnit, AreaOfPurpose, PhaseStatus
 from app.properties.enums import Availability
 from app.users.models import Customer
-from app.utils.helpers import allow_string_rep_of_enum, convert_to_decimal
+from app.utils.helpers import allow_string_rep_of_enum, convert_to_decimal, normalize_search_query, \
+    allow_list_of_enums
 
 User = get_user_model()
 
@@ -104,6 +106,30 @@ class PropertyListSchema(BaseModel):
                                           pre=True)(allow_string_rep_of_enum)
 
 
+class PropertySearchSchema(BaseModel):
+    q: str
+
+    _normalize_q = validator('q', allow_reuse=True, pre=True)(normalize_search_query)
+
+    @validator('q', allow_reuse=True)
+    def validate_q(cls, v):
+        if not v:
+            raise ValueError("Search query must contain at least one word")
+        return v
+
+
+class PropertyImageReorderSchema(BaseModel):
+    image_ids: List[int]  # in display order
+
+    @validator('image_ids')
+    def validate_image_ids(cls, v):
+        if not v:
+            raise ValueError("At least one image is required")
+        if len(set(v)) != len(v):
+            raise ValueError("Images can only be listed once")
+        return v
+
+
 # Phase Creation Schema
 class PhaseCreateSchema(BaseModel):
     property_id: int
@@ -277,3 +303,39 @@ class PlotListSchema(BaseModel):
     _validate_soil_type = validator('soil_type',
                                     allow_reuse=True,
                                     pre=True)(allow_string_rep_of_enum)
+
+
+class PlotFacetedSearchSchema(BaseModel):
+    phase_id: Optional[int]
+    property_id: Optional[int]
+    price_min: Optional[float]
+    price_max: Optional[float]
+    area_min: Optional[float]
+    area_max: Optional[float]
+    area_size_unit: AreaSizeUnit = AreaSizeUnit.SQ_FT  # unit of area_min/area_max
+    facing: Optional[List[Facing]]
+    soil_type: Optional[List[SoilType]]
+    availability: Optional[List[Availability]]
+    is_corner_site: Optional[bool]
+
+    _validate_area_size_unit = validator('area_size_unit',
+                                         allow_reuse=True,
+                                         pre=True)(allow_string_rep_of_enum)
+    # Validator to allow `facing=1,3` as well as repeated params
+    _validate_facets = validator('facing', 'soil_type', 'availability',
+                                 allow_reuse=True,
+                                 pre=True)(allow_list_of_enums)
+
+
+class PlotMapSchema(BaseModel):
+    whole_property: bool = False
+
+
+class PlotHoldSchema(BaseModel):
+    timeout: Optional[int]  # seconds, PLOT_HOLD_TIMEOUT when not given
+
+    @validator('timeout')
+    def validate_timeout(cls, value):
+        if value is not None and not 60 <= value <= settings.PLOT_HOLD_MAX_TIMEOUT:
+            raise ValueError(f"must be between 60 and {settings.PLOT_HOLD_MAX_TIMEOUT} seconds")
+        return value
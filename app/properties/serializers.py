@@ -1,10 +1,11 @@
-from django.db import models
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
 
 from app.properties.enums import AreaOfPurpose, PropertyType, PhaseStatus, Facing, SoilType, AreaSizeUnit, Availability
-from app.properties.models import Property, Phase, Plot, PropertyImage, Update, UpdateImage, Amenity, NearbyAttraction
+from app.properties.models import Property, Phase, Plot, PropertyImage, Update, UpdateImage, Amenity, \
+    NearbyAttraction, available_plots
 from app.users.serializers import UserSerializer, CustomerSerializer
-from app.utils.helpers import get_serialized_enum
+from app.utils.serializers import EnumField, ImageVariantsField
 
 from rest_framework import serializers
 from .models import PropertyImage
@@ -13,9 +14,11 @@ from rest_framework import serializers
 
 
 class UpdateImageSerializer(serializers.ModelSerializer):
+    image_srcset = ImageVariantsField('image')
+
     class Meta:
         model = UpdateImage
-        fields = ['id', 'update', 'image']
+        fields = ['id', 'update', 'image', 'image_srcset']
 
 
 class UpdateSerializer(serializers.ModelSerializer):
@@ -28,9 +31,11 @@ class UpdateSerializer(serializers.ModelSerializer):
 
 
 class PropertyImageSerializer(serializers.ModelSerializer):
+    image_srcset = ImageVariantsField('image')
+
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image', 'is_thumbnail', 'is_slider_image', 'slider_image_order']
+        fields = ['id', 'image', 'image_srcset', 'is_thumbnail', 'is_slider_image', 'slider_image_order']
 
     def validate(self, data):
         """
@@ -48,31 +53,17 @@ class PhaseSerializerSimple(serializers.ModelSerializer):
 
 
 class PhaseSerializer(serializers.ModelSerializer):
-    no_of_plots = serializers.SerializerMethodField()
+    no_of_plots = serializers.IntegerField(source='available_plot_count', read_only=True)
     area_size_from = serializers.SerializerMethodField()
-    area_size_unit = serializers.SerializerMethodField()
+    area_size_unit = EnumField(AreaSizeUnit)
     price_from = serializers.SerializerMethodField()
 
-    def get_no_of_plots(self, obj):
-        # Filter to count only plots that are not sold
-        return obj.plots.filter(is_booked=False).count()
-
     def get_area_size_from(self, obj):
-        # Filter to get the minimum price among unsold plots
-        min_sq_ft = obj.plots.filter(is_booked=False).aggregate(models.Min('area_size'))['area_size__min']
-        return min_sq_ft if min_sq_ft is not None else "No plots or no unsold plots"
-
-    def get_area_size_unit(self, obj):
-        # Filter to get the minimum price among unsold plots
-        plot_first: Plot = obj.plots.first()
-        if plot_first and plot_first.area_size_unit:
-            return get_serialized_enum(AreaSizeUnit(plot_first.area_size_unit))
-        return dict()
+        # Minimum area among unbooked plots, maintained on the phase by plot writes
+        return obj.min_area_size if obj.min_area_size is not None else "No plots or no unsold plots"
 
     def get_price_from(self, obj):
-        min_price = obj.plots.filter(is_booked=False).aggregate(models.Min('price'))['price__min']
-
-        return min_price if min_price is not None else "No Plots or No unsold plots"
+        return obj.min_price if obj.min_price is not None else "No Plots or No unsold plots"
 
     class Meta:
         model = Phase
@@ -81,41 +72,43 @@ class PhaseSerializer(serializers.ModelSerializer):
 
 
 class AmenitySerializer(serializers.ModelSerializer):
+    logo_srcset = ImageVariantsField('logo')
+
     class Meta:
         model = Amenity
-        fields = ['id', 'name', 'logo']
+        fields = ['id', 'name', 'logo', 'logo_srcset']
 
 
 class NearbyAttractionSerializer(serializers.ModelSerializer):
+    logo_srcset = ImageVariantsField('logo')
+
     class Meta:
         model = NearbyAttraction
-        fields = ['id', 'name', 'logo']
+        fields = ['id', 'name', 'logo', 'logo_srcset']
+
+
+class PropertySerializerSimple(serializers.ModelSerializer):
+    property_type = EnumField(PropertyType)
+
+    class Meta:
+        model = Property
+        fields = ['id', 'property_type', 'name', 'location']
 
 
 class PropertySerializer(serializers.ModelSerializer):
     created_by = UserSerializer()
     director = UserSerializer()
     current_lead = CustomerSerializer()
-    property_type = serializers.SerializerMethodField()
-    area_of_purpose = serializers.SerializerMethodField()
+    property_type = EnumField(PropertyType)
+    area_of_purpose = EnumField(AreaOfPurpose)
     images = PropertyImageSerializer(many=True, read_only=True)
     phases = serializers.SerializerMethodField()
     amenities = AmenitySerializer(many=True, read_only=True)
     nearby_attractions = NearbyAttractionSerializer(many=True, read_only=True)
 
-    def get_property_type(self, obj: Property):
-        if obj.property_type:
-            return get_serialized_enum(PropertyType(obj.property_type))
-        return dict()
-
-    def get_area_of_purpose(self, obj: Property):
-        if obj.area_of_purpose:
-            return get_serialized_enum(AreaOfPurpose(obj.area_of_purpose))
-        return dict()
-
     def get_phases(self, obj):
         # Filter phases to include only those with plots available
-        phases_with_plots = obj.phases.filter(plots__is_booked=False).distinct()
+        phases_with_plots = obj.phases.filter(Exists(available_plots(phase=OuterRef('pk'))))
         return PhaseSerializer(phases_with_plots, many=True).data
 
     class Meta:
@@ -144,38 +137,18 @@ class PropertySerializer(serializers.ModelSerializer):
 
 class PhaseSerializerComplex(serializers.ModelSerializer):
     property = PropertySerializer()
-    status = serializers.SerializerMethodField()
-    no_of_plots = serializers.SerializerMethodField()
+    status = EnumField(PhaseStatus)
+    no_of_plots = serializers.IntegerField(source='available_plot_count', read_only=True)
     area_size_from = serializers.SerializerMethodField()
-    area_size_unit = serializers.SerializerMethodField()
+    area_size_unit = EnumField(AreaSizeUnit)
     price_from = serializers.SerializerMethodField()
 
-    def get_no_of_plots(self, obj):
-        # Filter to count only plots that are not sold
-        return obj.plots.filter(is_booked=False).count()
-
     def get_area_size_from(self, obj):
-        # Filter to get the minimum price among unsold plots
-        min_sq_ft = obj.plots.filter(is_booked=False).aggregate(models.Min('area_size'))['area_size__min']
-        return min_sq_ft if min_sq_ft is not None else "No plots or no unsold plots"
-
-    def get_area_size_unit(self, obj):
-        # Filter to get the minimum price among unsold plots
-        plot_first: Plot = obj.plots.first()
-        if plot_first and plot_first.area_size_unit:
-            return get_serialized_enum(AreaSizeUnit(plot_first.area_size_unit))
-        return dict()
-
-    def get_status(self, obj: Phase):
-        if obj.status:
-            return get_serialized_enum(PhaseStatus(obj.status))
-        return dict()
+        # Minimum area among unbooked plots, maintained on the phase by plot writes
+        return obj.min_area_size if obj.min_area_size is not None else "No plots or no unsold plots"
 
     def get_price_from(self, obj):
-
-        min_price = obj.plots.filter(is_booked=False).aggregate(models.Min('price'))['price__min']
-
-        return min_price if min_price is not None else "No Plots or No unsold plots"
+        return obj.min_price if obj.min_price is not None else "No Plots or No unsold plots"
 
     class Meta:
         model = Phase
@@ -186,32 +159,12 @@ class PhaseSerializerComplex(serializers.ModelSerializer):
 class PlotSerializer(serializers.ModelSerializer):
     phase_details = PhaseSerializerComplex(source='phase', read_only=True)
     property_details = PropertySerializer(source='phase.property', read_only=True)  # Nested property details via phase
-    facing = serializers.SerializerMethodField()
-    soil_type = serializers.SerializerMethodField()
-    area_size_unit = serializers.SerializerMethodField()
-    availability = serializers.SerializerMethodField()
+    facing = EnumField(Facing)
+    soil_type = EnumField(SoilType)
+    area_size_unit = EnumField(AreaSizeUnit)
+    availability = EnumField(Availability)
     total_amount = serializers.SerializerMethodField()
 
-    def get_facing(self, obj: Plot):
-        if obj.facing:
-            return get_serialized_enum(Facing(obj.facing))
-        return dict()
-
-    def get_soil_type(self, obj: Plot):
-        if obj.soil_type:
-            return get_serialized_enum(SoilType(obj.soil_type))
-        return dict()
-
-    def get_area_size_unit(self, obj: Plot):
-        if obj.area_size_unit:
-            return get_serialized_enum(AreaSizeUnit(obj.area_size_unit))
-        return dict()
-
-    def get_availability(self, obj: Plot):
-        if obj.availability:
-            return get_serialized_enum(Availability(obj.availability))
-        return dict()
-
     def get_total_amount(self, obj: Plot):
         if obj.price is not None and obj.area_size is not None:
             return obj.price * obj.area_size
@@ -226,32 +179,12 @@ class PlotSerializer(serializers.ModelSerializer):
 
 
 class PlotSerializerSimple(serializers.ModelSerializer):
-    facing = serializers.SerializerMethodField()
-    soil_type = serializers.SerializerMethodField()
-    area_size_unit = serializers.SerializerMethodField()
-    availability = serializers.SerializerMethodField()
+    facing = EnumField(Facing)
+    soil_type = EnumField(SoilType)
+    area_size_unit = EnumField(AreaSizeUnit)
+    availability = EnumField(Availability)
     total_amount = serializers.SerializerMethodField()
 
-    def get_facing(self, obj: Plot):
-        if obj.facing:
-            return get_serialized_enum(Facing(obj.facing))
-        return dict()
-
-    def get_soil_type(self, obj: Plot):
-        if obj.soil_type:
-            return get_serialized_enum(SoilType(obj.soil_type))
-        return dict()
-
-    def get_area_size_unit(self, obj: Plot):
-        if obj.area_size_unit:
-            return get_serialized_enum(AreaSizeUnit(obj.area_size_unit))
-        return dict()
-
-    def get_availability(self, obj: Plot):
-        if obj.availability:
-            return get_serialized_enum(Availability(obj.availability))
-        return dict()
-
     def get_total_amount(self, obj: Plot):
         if obj.price is not None and obj.area_size is not None:
             return obj.price * obj.area_size
@@ -1,3 +1,382 @@
+import json
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app.properties.enums import PropertyType, Facing, SoilType, AreaSizeUnit
+from app.properties.inventory import plot_inventory, search_plots_in_db
+from app.properties.models import Property, PropertyImage, Phase, Plot, Amenity, NearbyAttraction, Update, UpdateImage
+from app.properties.views import PropertyViewSet, PhaseViewSet, UpdateViewSet, PlotViewSet
+from app.users.enums import Role
+from app.users.models import User, Customer
+
+
+def create_property_tree(index):
+    director = User.objects.create(name=f"Director {index}", role=Role.DIRECTOR)
+    sales_officer = User.objects.create(name=f"SO {index}", role=Role.SALES_OFFICER, director=director)
+    customer_user = User.objects.create(name=f"Customer {index}", role=Role.CUSTOMER, director=director)
+    customer = Customer.objects.create(user=customer_user, name=f"Customer {index}")
+    property = Property.objects.create(
+        property_type=PropertyType.DTCP_PLOTS, name=f"Property {index}",
+        created_by=sales_officer, director=director, current_lead=customer,
+    )
+    for image in range(2):
+        PropertyImage.objects.create(property=property, image=f"property_images/{index}-{image}.jpg")
+    property.amenities.add(*[Amenity.objects.create(name=f"Amenity {index}-{n}") for n in range(2)])
+    property.nearby_attractions.add(
+        *[NearbyAttraction.objects.create(name=f"Attraction {index}-{n}") for n in range(2)])
+    phase = Phase.objects.create(property=property, phase_number=1)
+    Plot.objects.create(phase=phase, plot_number=1, price=1000, area_size=1200)
+    customer.favorites.add(phase)
+    return property
+
+
+class QueryPlanTests(TestCase):
+    """
+    Query budgets per endpoint with a full page of related rows.
+    Related objects must come from the controller's read plan; a new per-row lookup will break these counts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.properties = [create_property_tree(index) for index in range(4)]
+        director = self.properties[0].director
+        for index in range(4):
+            update = Update.objects.create(title=f"Update {index}", description="", posted_by=director)
+            UpdateImage.objects.create(update=update, image=f"update_images/{index}.jpg")
+
+    def test_property_list(self):
+        view = PropertyViewSet.as_view({"get": "list"})
+        # count, page, 4 prefetches, then per property: SO clients count and available phases
+        with self.assertNumQueries(6 + 4 * 2):
+            response = view(self.factory.get("/properties/")).render()
+        self.assertEqual(4, len(response.data["results"]))
+
+    def test_property_retrieve(self):
+        view = PropertyViewSet.as_view({"get": "retrieve"})
+        with self.assertNumQueries(5 + 2):
+            response = view(self.factory.get("/properties/"), pk=self.properties[0].pk)
+        self.assertEqual(200, response.status_code)
+
+    def test_phase_list(self):
+        view = PhaseViewSet.as_view({"get": "list"})
+        # count, page, 4 prefetches of the parent properties, then the per-row queries of each property
+        with self.assertNumQueries(6 + 4 * 2):
+            response = view(self.factory.get("/phases/")).render()
+        self.assertEqual(4, len(response.data["results"]))
+
+    def test_update_list(self):
+        view = UpdateViewSet.as_view({"get": "list"})
+        with self.assertNumQueries(3):
+            response = view(self.factory.get("/updates/")).render()
+        self.assertEqual(4, len(response.data["results"]))
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.properties = [create_property_tree(index) for index in range(2)]
+
+    def test_fields_limit_the_payload_and_the_query_plan(self):
+        view = PropertyViewSet.as_view({"get": "list"})
+        # count, page and the images prefetch only
+        with self.assertNumQueries(3):
+            response = view(self.factory.get("/properties/", {"fields": "id,name,director,images"})).render()
+
+        result = response.data["results"][0]
+        self.assertEqual(["id", "name", "director", "images"], list(result))
+        self.assertEqual(self.properties[0].director_id, result["director"])
+        self.assertEqual(2, len(result["images"]))
+
+    def test_expand_renders_nested_serializers_with_their_own_fields(self):
+        view = PropertyViewSet.as_view({"get": "retrieve"})
+        property = self.properties[0]
+
+        response = view(self.factory.get("/properties/", {"fields": "id,current_lead.name,current_lead.user",
+                                                          "expand": "current_lead.user"}), pk=property.pk)
+
+        data = json.loads(response.content)
+        self.assertEqual({"name", "user"}, set(data["current_lead"]))
+        self.assertEqual(property.current_lead.user.name, data["current_lead"]["user"]["name"])
+
+    def test_sparse_and_full_responses_are_cached_separately(self):
+        view = PropertyViewSet.as_view({"get": "retrieve"})
+        pk = self.properties[0].pk
+
+        sparse = view(self.factory.get("/properties/", {"fields": "id"}), pk=pk)
+        full = view(self.factory.get("/properties/"), pk=pk)
+
+        self.assertEqual({"id": pk}, json.loads(sparse.content))
+        self.assertIn("images", json.loads(full.content))
+
+
+class PhasePlotAggregateTests(TestCase):
+    def setUp(self):
+        self.phase = create_property_tree(0).phases.get()
+        self.plot = self.phase.plots.get()
+
+    def assertAggregates(self, phase, count, min_price, min_area_size):
+        phase.refresh_from_db()
+        self.assertEqual((count, min_price, min_area_size),
+                         (phase.available_plot_count, phase.min_price, phase.min_area_size))
+
+    def test_plot_writes_refresh_the_phase(self):
+        self.assertAggregates(self.phase, 1, 1000, 1200)
+
+        Plot.objects.create(phase=self.phase, plot_number=2, price=800, area_size=1500, area_size_unit=2)
+        self.assertAggregates(self.phase, 2, 800, 1200)
+
+        self.plot.is_booked = True
+        self.plot.save()
+        self.assertAggregates(self.phase, 1, 800, 1500)
+        self.assertEqual(None, self.phase.area_size_unit)  # the first plot's unit
+
+        other_phase = Phase.objects.create(property=self.phase.property, phase_number=2)
+        self.plot.phase = other_phase
+        self.plot.save()
+        self.assertAggregates(self.phase, 1, 800, 1500)
+        self.assertEqual(2, self.phase.area_size_unit)
+        self.assertAggregates(other_phase, 0, None, None)
+
+        self.phase.plots.get().delete()
+        self.assertAggregates(self.phase, 0, None, None)
+
+    def test_bulk_writes_refresh_each_phase(self):
+        from app.properties.controllers import PlotController
+
+        controller = PlotController()
+        errors, _ = controller.bulk_create([{"phase_id": self.phase.pk, "price": 500, "area_size": 100}] * 3)
+        self.assertIsNone(errors)
+        self.assertAggregates(self.phase, 4, 500, 100)
+
+        errors, _ = controller.bulk_edit({plot.pk: {"is_booked": True} for plot in self.phase.plots.all()})
+        self.assertIsNone(errors)
+        self.assertAggregates(self.phase, 0, None, None)
+
+    def test_refresh_command_repairs_drift(self):
+        from django.core.management import call_command
+
+        Phase.objects.update(available_plot_count=0, min_price=None, min_area_size=None)
+        call_command("refresh_phase_aggregates", stdout=open("/dev/null", "w"))
+        self.assertAggregates(self.phase, 1, 1000, 1200)
+
+
+class AvailabilityFilterTests(TestCase):
+    def test_only_parents_with_unbooked_plots_are_listed_once(self):
+        from app.properties.controllers import PropertyController, PhaseController
+
+        available, booked = create_property_tree(0), create_property_tree(1)
+        Plot.objects.create(phase=available.phases.get(), plot_number=2)
+        booked.phases.get().plots.update(is_booked=True)
+
+        _, properties = PropertyController().filter()
+        _, phases = PhaseController().filter()
+        self.assertEqual([available.pk], [property.pk for property in properties])
+        self.assertEqual([available.phases.get().pk], [phase.pk for phase in phases])
+
+
+class PropertySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.properties = [create_property_tree(index) for index in range(3)]
+        Property.objects.filter(pk=self.properties[0].pk).update(name="Green Acres", location="Coimbatore")
+        self.properties[1].amenities.add(Amenity.objects.create(name="Swimming Pool"))
+
+    def search(self, q):
+        return PropertyViewSet.as_view({"get": "search"})(self.factory.get("/properties/search/", {"q": q}))
+
+    def test_matches_fields_and_amenities(self):
+        self.assertEqual([self.properties[0].pk], [row["id"] for row in self.search("green ACRES").data["results"]])
+        self.assertEqual([self.properties[1].pk], [row["id"] for row in self.search("pool").data["results"]])
+        self.assertEqual({"id", "property_type", "name", "location"}, set(self.search("pool").data["results"][0]))
+
+    def test_normalized_queries_share_a_cache_entry(self):
+        self.search("Green  Acres!")
+        with self.assertNumQueries(0):
+            response = self.search("green acres")
+        self.assertEqual(1, len(response.data["results"]))
+
+    def test_blank_query_is_rejected(self):
+        self.assertEqual(400, self.search(" ?! ").status_code)
+
+
+class PlotFacetedSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        plot_inventory.clear()
+        self.factory = APIRequestFactory()
+        self.phase = create_property_tree(0).phases.get()
+        self.phase.plots.update(is_booked=True)
+        self.plots = [
+            Plot.objects.create(phase=self.phase, plot_number=n, price=price, area_size=area, area_size_unit=unit,
+                                facing=facing, soil_type=SoilType.RED, is_corner_site=n == 2)
+            for n, (price, area, unit, facing) in enumerate([
+                (3000, 1200, AreaSizeUnit.SQ_FT, Facing.NORTH),
+                (1000, 200, AreaSizeUnit.YARDS, Facing.EAST),
+                (2000, 5, AreaSizeUnit.CENTS, Facing.NORTH),
+                (None, 1000, AreaSizeUnit.SQ_FT, None),
+            ], start=1)
+        ]
+
+    def search(self, **params):
+        return PlotViewSet.as_view({"get": "faceted_search"})(self.factory.get("/plots/faceted-search/", params))
+
+    def test_snapshot_matches_database(self):
+        for filters in ({}, {"facing": [Facing.NORTH]}, {"area_min": 1500, "is_corner_site": False},
+                        {"price_max": 2500, "soil_type": [SoilType.RED, SoilType.CLAY]}):
+            self.assertEqual(search_plots_in_db(filters), plot_inventory.search(filters), filters)
+
+    def test_results_and_facets(self):
+        response = self.search(facing="1,3", area_min=150, area_size_unit=AreaSizeUnit.YARDS)
+        self.assertEqual([self.plots[1].pk, self.plots[2].pk], [row["id"] for row in response.data["results"]])
+        # A facet's own filter does not narrow its counts
+        facets = self.search(facing=Facing.EAST, area_min=1350).data["facets"]
+        self.assertEqual({Facing.NORTH: 1, Facing.EAST: 1}, facets["facing"])
+        self.assertEqual({"true": 1, "false": 1}, response.data["facets"]["is_corner_site"])
+        self.assertEqual(400, self.search(facing="up").status_code)
+
+    def test_snapshot_follows_plot_writes(self):
+        self.assertEqual(4, len(plot_inventory.search({})[0]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plots[0].is_booked = True
+            self.plots[0].save()
+            self.plots[1].price = 5000
+            self.plots[1].save()
+            added = Plot.objects.create(phase=self.phase, plot_number=9, price=500)
+        ids, facets = plot_inventory.search({})
+        self.assertEqual([added.pk, self.plots[2].pk, self.plots[1].pk, self.plots[3].pk], ids)
+        self.assertEqual(search_plots_in_db({}), (ids, facets))
+
+
+class PhasePlotMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.property = create_property_tree(0)
+        self.phase = self.property.phases.get()
+        Plot.objects.create(phase=self.phase, plot_number=3, price=2000, is_booked=True, is_sold=True)
+        Plot.objects.create(phase=self.phase, plot_number=2, area_size=600, is_booked=True)
+        self.second_phase = Phase.objects.create(property=self.property, phase_number=2)
+        Plot.objects.create(phase=self.second_phase, plot_number=1, price=500)
+
+    def plot_map(self, pk, **params):
+        return PhaseViewSet.as_view({"get": "plot_map"})(self.factory.get(f"/phases/{pk}/plot-map/", params), pk=pk)
+
+    def test_phase_columns_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.plot_map(self.phase.pk)
+        phase_map = json.loads(response.content)["phases"][0]
+        self.assertEqual([1, 2, 3], phase_map["plot_numbers"])
+        self.assertEqual([1000.0, None, 2000.0], phase_map["prices"])
+        self.assertEqual([1200.0, 600.0, None], phase_map["area_sizes"])
+        self.assertEqual("Bg==", phase_map["booked"])  # 0b110: plots 2 and 3
+        self.assertEqual("BA==", phase_map["sold"])
+        with self.assertNumQueries(0):
+            self.plot_map(self.phase.pk)
+
+    def test_whole_property_in_three_queries(self):
+        with self.assertNumQueries(3):
+            response = self.plot_map(self.second_phase.pk, whole_property="true")
+        payload = json.loads(response.content)
+        self.assertEqual(self.property.pk, payload["property_id"])
+        self.assertEqual([(self.phase.pk, 1, 3), (self.second_phase.pk, 2, 1)],
+                         [(row["phase_id"], row["phase_number"], row["count"]) for row in payload["phases"]])
+
+    def test_plot_writes_refresh_the_map(self):
+        self.plot_map(self.second_phase.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Plot.objects.filter(phase=self.second_phase).get().delete()
+        self.assertEqual(0, json.loads(self.plot_map(self.second_phase.pk).content)["phases"][0]["count"])
+        self.assertEqual(404, self.plot_map(0).status_code)
+
+
+class PlotHoldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.property = create_property_tree(0)
+        self.plot = self.property.phases.get().plots.get()
+        self.officer, self.other_officer = self.property.created_by, self.property.director
+
+    def hold(self, user, method="post", **data):
+        request = getattr(self.factory, method)(f"/plots/{self.plot.pk}/hold/", data, format="json")
+        force_authenticate(request, user=user)
+        return PlotViewSet.as_view({"post": "hold", "delete": "release_hold"})(request, pk=self.plot.pk)
+
+    def test_first_taker_wins_until_release(self):
+        self.assertEqual(201, self.hold(self.officer, timeout=120).status_code)
+        self.assertEqual(200, self.hold(self.officer).status_code)
+        response = self.hold(self.other_officer)
+        self.assertEqual(409, response.status_code)
+        self.assertEqual(self.officer.pk, json.loads(response.content)["hold"]["held_by"])
+        self.assertEqual(409, self.hold(self.other_officer, method="delete").status_code)
+
+        self.assertEqual(200, self.hold(self.officer, method="delete").status_code)
+        self.assertEqual(201, self.hold(self.other_officer).status_code)
+
+    def test_listing_shows_current_holds(self):
+        view = PlotViewSet.as_view({"get": "list"})
+        response = view(self.factory.get("/plots/"))
+        self.assertEqual([None], [row["hold"] for row in response.data["results"]])
+
+        self.hold(self.officer)
+        response = view(self.factory.get("/plots/", HTTP_IF_NONE_MATCH=response["ETag"]))
+        self.assertEqual([self.officer.pk], [row["hold"]["held_by"] for row in response.data["results"]])
+
+    def test_streamed_and_sparse_listings(self):
+        self.hold(self.officer)
+        view = PlotViewSet.as_view({"get": "list"})
+        response = view(self.factory.get("/plots/", {"page": "all"}))
+        rows = json.loads(b"".join(response.streaming_content))["results"]
+        self.assertEqual([self.officer.pk], [row["hold"]["held_by"] for row in rows])
+
+        response = view(self.factory.get("/plots/", {"fields": "plot_number"}))
+        self.assertEqual([{"plot_number"}], [set(row) for row in response.data["results"]])
+        response = view(self.factory.get("/plots/", {"fields": "hold"}))
+        self.assertEqual([self.officer.pk], [row["hold"]["held_by"] for row in response.data["results"]])
+
+    def test_booked_plots_and_bad_timeouts_are_rejected(self):
+        self.assertEqual(400, self.hold(self.officer, timeout=10).status_code)
+        Plot.objects.filter(pk=self.plot.pk).update(is_booked=True)
+        self.assertEqual(400, self.hold(self.officer).status_code)
+
+
+class PropertyImageOrderTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.property = create_property_tree(0)
+        self.plain, self.other_plain = self.property.images.all()
+        self.second = PropertyImage.objects.create(property=self.property, image="property_images/s2.jpg",
+                                                   is_slider_image=True, slider_image_order=2)
+        self.first = PropertyImage.objects.create(property=self.property, image="property_images/s1.jpg",
+                                                  is_slider_image=True, slider_image_order=1)
+
+    def image_ids(self):
+        property = Property.objects.prefetch_related("images").get(pk=self.property.pk)
+        return [image.pk for image in property.images.all()]
+
+    def reorder(self, image_ids):
+        request = self.factory.post(f"/properties/{self.property.pk}/reorder-images/", {"image_ids": image_ids},
+                                    format="json")
+        return PropertyViewSet.as_view({"post": "reorder_images"})(request, pk=self.property.pk)
+
+    def test_slider_images_first_in_their_order(self):
+        self.assertEqual([self.first.pk, self.second.pk, self.plain.pk, self.other_plain.pk], self.image_ids())
+
+        self.first.slider_image_order = 3
+        self.first.save(update_fields=["slider_image_order"])
+        self.assertEqual([self.second.pk, self.first.pk, self.plain.pk, self.other_plain.pk], self.image_ids())
+
+    def test_reorder_in_one_update(self):
+        new_order = [self.other_plain.pk, self.first.pk, self.plain.pk, self.second.pk]
+        with self.assertNumQueries(2):  # lock the rows, then a single UPDATE
+            self.assertEqual(200, self.reorder(new_order).status_code)
+        self.assertEqual([self.first.pk, self.second.pk, self.other_plain.pk, self.plain.pk], self.image_ids())
 
-# Create your tests here.
+        foreign = create_property_tree(1).images.first()
+        self.assertEqual(400, self.reorder([self.first.pk, foreign.pk]).status_code)
+        self.assertEqual(400, self.reorder([self.first.pk, self.first.pk]).status_code)
@@ -1,26 +1,45 @@
+import hashlib
 from datetime import datetime
 
+from django.conf import settings
 from django.http import JsonResponse
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter, OpenApiResponse
 
+from app.crm.models import CRMLead
 from app.properties.controllers import PropertyController, PhaseController, PlotController, UpdateController
+from app.properties.holds import HOLDS_LABEL, hold_plot, release_plot_hold, with_plot_holds
+from app.properties.models import Property, PropertyImage, Phase, Plot, Update, UpdateImage, Amenity, \
+    NearbyAttraction
 from app.properties.schemas import PropertyUpdateSchema, PropertyCreateSchema, PropertyListSchema, PhaseCreateSchema, \
-    PhaseUpdateSchema, PhaseListSchema, PlotCreateSchema, PlotUpdateSchema, PlotListSchema, UpdateListSchema
+    PhaseUpdateSchema, PhaseListSchema, PlotCreateSchema, PlotUpdateSchema, PlotListSchema, UpdateListSchema, \
+    PropertySearchSchema, PlotFacetedSearchSchema, PlotMapSchema, PlotHoldSchema, PropertyImageReorderSchema
 from app.properties.serializers import PropertySerializer, PhaseSerializer, PlotSerializer, PlotSerializerSimple, \
-    PhaseSerializerComplex, UpdateSerializer
+    PhaseSerializerComplex, UpdateSerializer, PropertySerializerSimple
+from app.utils.cache import get_cache_version, get_or_build
 from app.utils.constants import CacheKeys
+from app.utils.helpers import build_cache_key, build_filter_params, qdict_to_dict
 from app.utils.pagination import CustomPageNumberPagination
+from app.users.models import User, Customer
+from app.utils.renderers import ORJSONResponse
 from app.utils.views import BaseViewSet
 
+# Every model read by the nested property payload (users embed their CRM lead count).
+PROPERTY_CACHE_MODELS = (Property, PropertyImage, Phase, Plot, Amenity, NearbyAttraction, User, Customer, CRMLead)
+
 
 class UpdateViewSet(BaseViewSet):
     controller = UpdateController()
     serializer = UpdateSerializer
     list_schema = UpdateListSchema
-    cache_key_retrieve = CacheKeys.PROPERTY_DETAILS_BY_PK
-    cache_key_list = CacheKeys.PROPERTY_LIST
+    cache_key_retrieve = CacheKeys.UPDATE_DETAILS_BY_PK
+    cache_key_list = CacheKeys.UPDATE_LIST
+    cache_models = (Update, UpdateImage, User, CRMLead)
 
     def list(self, request, **kwargs):
         return super().list(request, **kwargs)
@@ -37,6 +56,8 @@ class PropertyViewSet(BaseViewSet):
     list_schema = PropertyListSchema
     cache_key_retrieve = CacheKeys.PROPERTY_DETAILS_BY_PK
     cache_key_list = CacheKeys.PROPERTY_LIST
+    cache_models = PROPERTY_CACHE_MODELS
+    local_cache_retrieve = True
 
     @extend_schema(
         description="Create a new property",
@@ -145,6 +166,61 @@ class PropertyViewSet(BaseViewSet):
     def make_inactive(self, request, pk, *args, **kwargs):
         return super().make_inactive(request, pk, *args, **kwargs)
 
+    @extend_schema(
+        description="Set the display order of a property's images. Slider images are still shown first.",
+        request=PropertyImageReorderSchema,
+        parameters=[
+            OpenApiParameter(name='pk', location=OpenApiParameter.PATH, required=True, type=int,
+                             description='Property ID'),
+        ],
+        examples=[
+            OpenApiExample('Image Reorder Request JSON', value={"image_ids": [12, 10, 11]})
+        ],
+        responses={200: OpenApiResponse(description="Images reordered")}
+    )
+    @action(methods=['POST'], detail=True, url_path='reorder-images')
+    def reorder_images(self, request, pk, *args, **kwargs):
+        errors, data = self.controller.parse_request(PropertyImageReorderSchema, request.data)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        errors, updated = self.controller.reorder_images(pk, data.image_ids)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+        return ORJSONResponse(data={"updated": updated, "message": "Images reordered"}, status=status.HTTP_200_OK)
+
+    def get_base_serializer(self):
+        if self.action == 'search':
+            return PropertySerializerSimple
+        return super().get_base_serializer()
+
+    @extend_schema(
+        description="Full-text search over available properties (name, location, description and amenities), "
+                    "best match first",
+        parameters=[
+            OpenApiParameter(name='q', type=str, required=True),
+        ],
+        responses={200: PropertySerializerSimple(many=True)}
+    )
+    @action(methods=['GET'], detail=False)
+    def search(self, request):
+        errors, data = self.controller.parse_request(PropertySearchSchema, qdict_to_dict(request.query_params))
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Queries are normalized by the schema, so "Green  Acres!" and "green acres" share a cache entry.
+        paginator = self.pagination_class()
+        cache_key = build_cache_key(
+            CacheKeys.PROPERTY_SEARCH,
+            version=self.get_cache_version(),
+            locale=get_language(),
+            page=paginator.get_page_key(request),
+            page_size=paginator.get_page_size(request),
+            params=build_filter_params(q=data.q, **self.get_sparse_params()),
+        )
+        res = get_or_build(cache_key, lambda: self.paginate(paginator, self.controller.search(data.q), request))
+        return Response(res, status=status.HTTP_200_OK)
+
 
 class PhaseViewSet(BaseViewSet):
     controller = PhaseController()
@@ -154,6 +230,8 @@ class PhaseViewSet(BaseViewSet):
     list_schema = PhaseListSchema
     cache_key_retrieve = CacheKeys.PHASE_DETAILS_BY_PK
     cache_key_list = CacheKeys.PHASE_LIST
+    cache_models = PROPERTY_CACHE_MODELS
+    local_cache_retrieve = True
 
     @extend_schema(
         description="Create a new phase",
@@ -225,6 +303,35 @@ class PhaseViewSet(BaseViewSet):
     def make_inactive(self, request, pk, *args, **kwargs):
         return super().make_inactive(request, pk, *args, **kwargs)
 
+    @extend_schema(
+        description="Status of every plot in a phase as parallel arrays ordered by plot number. `booked` and `sold` "
+                    "are base64 bitmaps, bit i % 8 of byte i // 8 for plot i. With whole_property, every phase of "
+                    "the phase's property is included.",
+        parameters=[
+            OpenApiParameter(name='pk', location=OpenApiParameter.PATH, required=True, type=int,
+                             description='Phase ID'),
+            OpenApiParameter(name='whole_property', type=bool),
+        ],
+        responses={200: OpenApiResponse(description="Plot map of the phase(s)")}
+    )
+    @action(methods=['GET'], detail=True, url_path='plot-map')
+    def plot_map(self, request, pk, *args, **kwargs):
+        errors, data = self.controller.parse_request(PlotMapSchema, qdict_to_dict(request.query_params))
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Only plots and phases are read, so unrelated writes to the property tree keep the entry.
+        cache_key = build_cache_key(
+            CacheKeys.PHASE_PLOT_MAP,
+            version=get_cache_version((Phase, Plot)),
+            pk=pk,
+            params=build_filter_params(whole_property=data.whole_property),
+        )
+        res = get_or_build(cache_key, lambda: self.controller.get_plot_map(pk, data.whole_property), local=True)
+        if res is None:
+            return ORJSONResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        return self.render_response(res)
+
     @action(detail=True, methods=['post'], url_path='add-to-favorites')
     def add_to_favorites(self, request, pk=None):
         customer = request.user.customer
@@ -247,7 +354,7 @@ class PhaseViewSet(BaseViewSet):
     def list_favorites(self, request):
         paginator = CustomPageNumberPagination()
         customer = request.user.customer
-        queryset = customer.favorites.all()
+        queryset = self.controller.apply_query_plan(customer.favorites.all())
         page = paginator.paginate_queryset(queryset, request, view=self)
         if page is not None:
             res = self.controller.serialize_queryset(page, PhaseSerializerComplex)
@@ -264,6 +371,7 @@ class PlotViewSet(BaseViewSet):
     list_schema = PlotListSchema
     cache_key_retrieve = CacheKeys.PLOT_DETAILS_BY_PK
     cache_key_list = CacheKeys.PLOT_LIST
+    cache_models = (Plot,)
 
     @extend_schema(
         description="Create a new plot",
@@ -323,7 +431,36 @@ class PlotViewSet(BaseViewSet):
         responses={200: PlotSerializer(many=True)}
     )
     def list(self, request, **kwargs):
-        return super().list(request, **kwargs)
+        response = super().list(request, **kwargs)
+        # Holds live outside the cached page: overlay the current ones, one MGET per page
+        if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            response.data = {**response.data, 'results': self.add_plot_holds(response.data['results'])}
+        return response
+
+    def serialize_chunk(self, rows, serializer):
+        # page=all: one MGET per streamed chunk
+        return self.add_plot_holds(super().serialize_chunk(rows, serializer))
+
+    def get_sparse_fields(self):
+        fields, expand = super().get_sparse_fields()
+        if 'hold' in fields:
+            # Holds are looked up by plot id
+            fields.setdefault('id', {})
+        return fields, expand
+
+    def add_plot_holds(self, rows):
+        """`with_plot_holds`, unless `?fields=` leaves `hold` out."""
+        fields, _ = self.get_sparse_fields()
+        if fields and 'hold' not in fields:
+            return rows
+        return with_plot_holds(rows)
+
+    def get_validators(self, request, cache_key, queryset):
+        etag, last_modified = super().get_validators(request, cache_key, queryset)
+        if self.action == 'list' and etag:
+            # Listed rows carry their holds. An expired hold served from a 304 is harmless, it has its expires_at.
+            etag = quote_etag(hashlib.md5(f"{etag}:{get_cache_version((HOLDS_LABEL,))}".encode()).hexdigest())
+        return etag, last_modified
 
     @extend_schema(
         description="Retrieve a specific plot by id",
@@ -345,3 +482,74 @@ class PlotViewSet(BaseViewSet):
     @action(methods=['POST'], detail=True)
     def make_inactive(self, request, pk, *args, **kwargs):
         return super().make_inactive(request, pk, *args, **kwargs)
+
+    @extend_schema(
+        description="Unbooked plots matching price, area and facet filters, cheapest first, with per-facet counts. "
+                    "Each facet is counted under every filter except its own.",
+        parameters=[
+            OpenApiParameter(name='phase_id', type=int),
+            OpenApiParameter(name='property_id', type=int),
+            OpenApiParameter(name='price_min', type=float),
+            OpenApiParameter(name='price_max', type=float),
+            OpenApiParameter(name='area_min', type=float),
+            OpenApiParameter(name='area_max', type=float),
+            OpenApiParameter(name='area_size_unit', type=int, description='Unit of area_min/area_max (default sq ft)'),
+            OpenApiParameter(name='facing', type=str, description='Comma separated Facing values'),
+            OpenApiParameter(name='soil_type', type=str, description='Comma separated SoilType values'),
+            OpenApiParameter(name='availability', type=str, description='Comma separated Availability values'),
+            OpenApiParameter(name='is_corner_site', type=bool),
+        ],
+        responses={200: PlotSerializerSimple(many=True)}
+    )
+    @action(methods=['GET'], detail=False, url_path='faceted-search')
+    def faceted_search(self, request):
+        errors, data = self.controller.parse_request(PlotFacetedSearchSchema, qdict_to_dict(request.query_params))
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        ids, facets = self.controller.faceted_search(**data.dict(exclude_none=True))
+        paginator = self.pagination_class()
+        page_ids = paginator.paginate_queryset(ids, request, view=self)
+        # Only the page is read from the database, in the search order
+        plots = self.get_sparse_queryset(self.controller.get_queryset()).in_bulk(page_ids)
+        page = [plots[plot_id] for plot_id in page_ids if plot_id in plots]
+        res = paginator.get_paginated_data(
+            self.add_plot_holds(self.controller.serialize_queryset(page, self.get_serializer_class())))
+        res['facets'] = facets
+        return Response(res, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description="Hold an unbooked plot for a buyer. The hold expires after `timeout` seconds; holding a plot "
+                    "you already hold returns the current hold unchanged.",
+        request=PlotHoldSchema,
+        responses={201: OpenApiResponse(description="Plot held"),
+                   409: OpenApiResponse(description="Plot is held by another user")}
+    )
+    @action(methods=['POST'], detail=True, permission_classes=[IsAuthenticated])
+    def hold(self, request, pk, *args, **kwargs):
+        errors, data = self.controller.parse_request(PlotHoldSchema, request.data)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        is_booked = list(self.controller.model.objects.filter(pk=pk).values_list('is_booked', flat=True))
+        if not is_booked:
+            return ORJSONResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        if is_booked[0]:
+            return ORJSONResponse({"error": "Plot is already booked"}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, hold = hold_plot(pk, request.user.pk, data.timeout or settings.PLOT_HOLD_TIMEOUT)
+        if hold['held_by'] != request.user.pk:
+            return ORJSONResponse({"error": "Plot is held by another user", "hold": hold},
+                                  status=status.HTTP_409_CONFLICT)
+        return ORJSONResponse(hold, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @extend_schema(
+        description="Release your hold on a plot",
+        responses={200: OpenApiResponse(description="Hold released"),
+                   409: OpenApiResponse(description="Plot is held by another user")}
+    )
+    @hold.mapping.delete
+    def release_hold(self, request, pk, *args, **kwargs):
+        if not release_plot_hold(pk, request.user.pk):
+            return ORJSONResponse({"error": "Plot is held by another user"}, status=status.HTTP_409_CONFLICT)
+        return ORJSONResponse({"message": "Hold released"}, status=status.HTTP_200_OK)
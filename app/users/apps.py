@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app.users"
+
+    def ready(self):
+        from app.files.images import watch_image_fields
+        from app.utils.cache import watch_models
+
+        watch_models(*self.get_models())
+        watch_image_fields(self.get_model('Customer'), 'image')
@@ -10,11 +10,16 @@ UserModel = get_user_model()
 
 
 class UserController(Controller):
+    select_related = ('director',)
+
     def __init__(self):
         self.model = UserModel
 
 
 class CustomerController(Controller):
+    select_related = ('user__director',)
+    prefetch_related = ('favorites',)
+
     def __init__(self):
         self.model = Customer
 
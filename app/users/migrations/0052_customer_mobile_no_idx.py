@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0051_userquery_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['mobile_no'], name='customer_mobile_no_idx'),
+        ),
+    ]
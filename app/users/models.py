@@ -81,6 +81,7 @@ class Customer(models.Model):
     favorites = models.ManyToManyField('properties.Phase', related_name='favorited_by', blank=True)
     name = models.CharField(max_length=255, blank=True, null=True)
     image = models.ImageField(upload_to='customers/profile_images/', blank=True, null=True)
+    image_variants = models.JSONField(blank=True, null=True, editable=False)  # see app.files.images
     mobile_no = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField('email address', blank=True, null=True)
     occupation = models.CharField(max_length=255, blank=True, null=True)
@@ -92,5 +93,11 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Customer lookups by phone number
+            models.Index(fields=['mobile_no'], name='customer_mobile_no_idx'),
+        ]
+
     def __str__(self):
         return f"id: {self.id}. {self.name} [{self.mobile_no}]"
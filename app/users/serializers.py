@@ -7,6 +7,7 @@ from app.crm.models import CRMLead
 from app.users.models import User, Customer, FAQ, UserQuery
 from app.users.enums import Role
 from app.utils.helpers import get_serialized_enum
+from app.utils.serializers import ImageVariantsField
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -45,6 +46,14 @@ class UserSerializer(serializers.ModelSerializer):
         return dict()
 
 
+class UserSerializerSimple(serializers.ModelSerializer):
+    role = serializers.ChoiceField(choices=Role.choices)
+
+    class Meta:
+        model = User
+        fields = ['id', 'name', 'mobile_no', 'role']
+
+
 class FAQSerializer(serializers.ModelSerializer):
     class Meta:
         model = FAQ
@@ -61,6 +70,7 @@ class UserQuerySerializer(serializers.ModelSerializer):
 
 class CustomerSerializer(serializers.ModelSerializer):
     user = UserSerializer(required=False)
+    image_srcset = ImageVariantsField('image')
 
     def get_favorites(self, obj):
         # Simplify the output to avoid deep serialization, if needed
@@ -74,6 +84,7 @@ class CustomerSerializer(serializers.ModelSerializer):
             'favorites',
             'name',
             'image',
+            'image_srcset',
             'mobile_no',
             'email',
             'occupation',
@@ -83,3 +94,9 @@ class CustomerSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
+
+
+class CustomerSerializerSimple(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = ['id', 'name', 'mobile_no', 'email']
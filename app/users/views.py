@@ -18,6 +18,7 @@ from rest_framework.response import Response
 
 from app.users.controllers import UserController, CustomerController
 from app.users.enums import Role
+from app.crm.models import CRMLead
 from app.users.models import Customer, FAQ, UserQuery
 from app.users.schemas import UserCreateSchema, UserUpdateSchema, UserListSchema, CustomerCreateSchema, \
     CustomerUpdateSchema, CustomerListSchema
@@ -224,6 +225,7 @@ class UserViewSet(BaseViewSet):
     list_schema = UserListSchema
     cache_key_retrieve = CacheKeys.USER_DETAILS_BY_PK
     cache_key_list = CacheKeys.USER_LIST
+    cache_models = (User, CRMLead)
 
     @extend_schema(
         description="Create a new user",
@@ -298,6 +300,7 @@ class CustomerViewSet(BaseViewSet):
     list_schema = CustomerListSchema
     cache_key_retrieve = CacheKeys.CUSTOMER_DETAILS_BY_PK
     cache_key_list = CacheKeys.CUSTOMER_LIST
+    cache_models = (Customer, User, CRMLead)
 
     @extend_schema(
         description="Create a new customer",
@@ -0,0 +1,136 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from app.utils.constants import CacheKeys, Timeouts
+from app.utils.local_cache import local_cache, local_generations, invalidation_listener, local_tier_active, \
+    publish_invalidation
+
+# How long a loser of the rebuild lock waits for the winner when there is no stale value to serve.
+REBUILD_WAIT_INTERVAL = 0.05
+REBUILD_WAIT_ATTEMPTS = 20
+
+
+def get_model_label(model):
+    """Return the lowercase `app_label.model_name` used to key a model's cache generation."""
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def get_cache_version(models):
+    """
+    Build the version stamp for a cached payload from the generation counters of every model it reads.
+    A bump on any of those models changes the stamp, so older entries are never read again and simply expire.
+    """
+    labels = [get_model_label(model) for model in models]
+    generations = {}
+    local = local_tier_active()
+    if local:
+        for label in labels:
+            generation = local_generations.get(label)
+            if generation is not None:
+                generations[label] = generation
+
+    missing = {CacheKeys.MODEL_GENERATION.value.format(model=label): label
+               for label in labels if label not in generations}
+    if missing:
+        epoch = invalidation_listener.epoch
+        fetched = cache.get_many(list(missing))
+        for key, label in missing.items():
+            generations[label] = fetched.get(key, 0)
+            # Skip the local copy if an invalidation arrived while we were reading, it may already be stale.
+            if local and epoch == invalidation_listener.epoch:
+                local_generations.set(label, generations[label])
+    return ".".join(str(generations[label]) for label in labels)
+
+
+def bump_cache_version(*models):
+    """Increment the generation counter of each given model and notify every worker's local tier."""
+    labels = [get_model_label(model) for model in models]
+    for label in labels:
+        key = CacheKeys.MODEL_GENERATION.value.format(model=label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter not created yet (or evicted); start a fresh generation.
+            cache.set(key, 1, timeout=None)
+    publish_invalidation(labels)
+
+
+def invalidate_cache(*models):
+    """
+    Bump the generation of each given model once the current transaction commits.
+    Bumping earlier would let a concurrent reader cache pre-commit data under the new generation.
+    """
+    transaction.on_commit(lambda: bump_cache_version(*models))
+
+
+def get_or_build(key, build, timeout=Timeouts.MINUTES_10, stale_timeout=Timeouts.MINUTES_2, local=False):
+    """
+    Read-through cache with single-flight rebuilds and stale-while-revalidate.
+
+    Entries stay fresh for `timeout` seconds and are kept `stale_timeout` seconds longer. Once an entry goes
+    stale, only the worker that takes the rebuild lock calls `build`; everyone else keeps getting the stale value
+    until the new one lands. `build` returning None (e.g. not found) is passed through and never cached.
+
+    With `local=True` the per-worker LRU is consulted first and filled from Redis, when the local tier is enabled.
+    """
+    if local and local_tier_active():
+        value = local_cache.get(key)
+        if value is None:
+            value = get_or_build(key, build, timeout=timeout, stale_timeout=stale_timeout)
+            if value is not None:
+                local_cache.set(key, value)
+        return value
+
+    entry = cache.get(key)
+    if entry is not None and entry["fresh_until"] > time.time():
+        return entry["value"]
+
+    lock_key = CacheKeys.REBUILD_LOCK.value.format(key=key)
+    if cache.add(lock_key, 1, timeout=Timeouts.SECONDS_10):
+        try:
+            value = build()
+            if value is not None:
+                cache.set(key, {"value": value, "fresh_until": time.time() + timeout},
+                          timeout=timeout + stale_timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry["value"]
+
+    # Cold key and another worker is already building it: wait briefly for its result rather than piling on.
+    for _ in range(REBUILD_WAIT_ATTEMPTS):
+        time.sleep(REBUILD_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+        if cache.get(lock_key) is None:
+            # The winner finished without caching anything (nothing to cache, or it failed).
+            break
+    return build()
+
+
+def _invalidate_sender(sender, **kwargs):
+    invalidate_cache(sender)
+
+
+def _invalidate_m2m(sender, instance, model, **kwargs):
+    invalidate_cache(type(instance), model)
+
+
+def watch_models(*models):
+    """
+    Connect cache invalidation to every save/delete of the given models, including their many-to-many fields.
+    Writes that bypass signals (`QuerySet.update`, `bulk_update`) must call `invalidate_cache` themselves.
+    """
+    for model in models:
+        post_save.connect(_invalidate_sender, sender=model, dispatch_uid=f"invalidate_cache_save_{model._meta.label}")
+        post_delete.connect(_invalidate_sender, sender=model,
+                            dispatch_uid=f"invalidate_cache_delete_{model._meta.label}")
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(_invalidate_m2m, sender=field.remote_field.through,
+                                dispatch_uid=f"invalidate_cache_m2m_{model._meta.label}_{field.name}")
@@ -14,27 +14,38 @@ class Timeouts:
 
 
 class CacheKeys(Enum):
+    # GENERATIONS
+    MODEL_GENERATION = "generation:{model}"
+    REBUILD_LOCK = "rebuild_lock:{key}"
+
     # LIST
-    USER_LIST = None
-    CUSTOMER_LIST = None
-    PROPERTY_LIST = None
-    PHASE_LIST = None
-    PLOT_LIST = None
-    CRM_LEAD_LIST = None
-    STATUS_CHANGE_REQUEST_LIST = None
-    PAYMENT_LIST = None
-    SITE_VISIT_LIST = None
+    USER_LIST = "user_list:{version}:{locale}:{page}:{page_size}:{params}"
+    CUSTOMER_LIST = "customer_list:{version}:{locale}:{page}:{page_size}:{params}"
+    UPDATE_LIST = "update_list:{version}:{locale}:{page}:{page_size}:{params}"
+    PROPERTY_LIST = "property_list:{version}:{locale}:{page}:{page_size}:{params}"
+    PHASE_LIST = "phase_list:{version}:{locale}:{page}:{page_size}:{params}"
+    PLOT_LIST = "plot_list:{version}:{locale}:{page}:{page_size}:{params}"
+    CRM_LEAD_LIST = "crm_lead_list:{version}:{locale}:{page}:{page_size}:{params}"
+    STATUS_CHANGE_REQUEST_LIST = "status_change_request_list:{version}:{locale}:{page}:{page_size}:{params}"
+    PAYMENT_LIST = "payment_list:{version}:{locale}:{page}:{page_size}:{params}"
+    SITE_VISIT_LIST = "site_visit_list:{version}:{locale}:{page}:{page_size}:{params}"
+    PROPERTY_SEARCH = "property_search:{version}:{locale}:{page}:{page_size}:{params}"
 
     # DETAILS
-    USER_DETAILS_BY_PK = None
-    CUSTOMER_DETAILS_BY_PK = None
-    PROPERTY_DETAILS_BY_PK = None
-    PHASE_DETAILS_BY_PK = None
-    PLOT_DETAILS_BY_PK = None
-    CRM_LEAD_DETAILS_BY_PK = None
-    STATUS_CHANGE_REQUEST_DETAILS_BY_PK = None
-    PAYMENT_DETAILS_BY_PK = None
-    SITE_VISIT_DETAILS_BY_PK = None
+    USER_DETAILS_BY_PK = "user_details:{version}:{locale}:{pk}:{params}"
+    CUSTOMER_DETAILS_BY_PK = "customer_details:{version}:{locale}:{pk}:{params}"
+    UPDATE_DETAILS_BY_PK = "update_details:{version}:{locale}:{pk}:{params}"
+    PROPERTY_DETAILS_BY_PK = "property_details:{version}:{locale}:{pk}:{params}"
+    PHASE_DETAILS_BY_PK = "phase_details:{version}:{locale}:{pk}:{params}"
+    PLOT_DETAILS_BY_PK = "plot_details:{version}:{locale}:{pk}:{params}"
+    CRM_LEAD_DETAILS_BY_PK = "crm_lead_details:{version}:{locale}:{pk}:{params}"
+    STATUS_CHANGE_REQUEST_DETAILS_BY_PK = "status_change_request_details:{version}:{locale}:{pk}:{params}"
+    PAYMENT_DETAILS_BY_PK = "payment_details:{version}:{locale}:{pk}:{params}"
+    SITE_VISIT_DETAILS_BY_PK = "site_visit_details:{version}:{locale}:{pk}:{params}"
+    PHASE_PLOT_MAP = "phase_plot_map:{version}:{pk}:{params}"
+
+    # PLOT HOLDS
+    PLOT_HOLD = "plot_hold:{pk}"
 
 
 class SMS:
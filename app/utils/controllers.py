@@ -1,11 +1,79 @@
+from django.db import router, transaction
+from django.db.models import Prefetch
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from pydantic import ValidationError
+from app.utils.cache import invalidate_cache
 from app.utils.helpers import get_serialized_exception
+from app.utils.serializers import prune_lookups
+
+
+def nest_query_plan(prefix, lookups):
+    """
+    Re-root select_related/prefetch_related lookups under a relation, e.g. reuse the CRM lead plan from payments
+    with `nest_query_plan('crm_lead', CRMLeadController.prefetch_related)`.
+    """
+    nested = []
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch):
+            nested.append(Prefetch(f"{prefix}__{lookup.prefetch_through}", queryset=lookup.queryset,
+                                   to_attr=lookup.to_attr))
+        else:
+            nested.append(f"{prefix}__{lookup}")
+    return tuple(nested)
 
 
 class Controller:
     model = None  # This should be set by the subclasses
 
+    # Read plan, applied to every queryset used for listing and retrieving so nested serializers don't fan out.
+    select_related = ()
+    prefetch_related = ()  # lookups or Prefetch objects
+    only_fields = ()
+    defer_fields = ()
+    # Lighter plan for list queries (`filter`) whose serializer reads less; None falls back to the plan above.
+    list_select_related = None
+    list_prefetch_related = None
+
+    # Models whose save() derives columns or writes other rows must load the row and save it whole on edit.
+    full_save_on_edit = False
+
+    def apply_query_plan(self, queryset, select_related=None, prefetch_related=None):
+        select_related = self.select_related if select_related is None else select_related
+        prefetch_related = self.prefetch_related if prefetch_related is None else prefetch_related
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if self.only_fields:
+            queryset = queryset.only(*self.only_fields)
+        if self.defer_fields:
+            queryset = queryset.defer(*self.defer_fields)
+        return queryset
+
+    def get_queryset(self):
+        return self.apply_query_plan(self.model.objects.all())
+
+    def get_list_plan(self):
+        return (
+            self.select_related if self.list_select_related is None else self.list_select_related,
+            self.prefetch_related if self.list_prefetch_related is None else self.list_prefetch_related,
+        )
+
+    def get_list_queryset(self):
+        select_related, prefetch_related = self.get_list_plan()
+        return self.apply_query_plan(self.model.objects.all(), select_related, prefetch_related)
+
+    def apply_sparse_query_plan(self, queryset, serializer_class, fields, expand, list_mode=False):
+        """Swap the full (or list) read plan on `queryset` for the part a sparse `serializer_class` will read."""
+        select_related, prefetch_related = self.get_list_plan() if list_mode else \
+            (self.select_related, self.prefetch_related)
+        return self.apply_query_plan(
+            queryset.select_related(None).prefetch_related(None),
+            select_related=prune_lookups(serializer_class, select_related, fields, expand),
+            prefetch_related=prune_lookups(serializer_class, prefetch_related, fields, expand),
+        )
+
     def create(self, **kwargs):
         try:
             instance = self.model.objects.create(**kwargs)
@@ -13,19 +81,119 @@ class Controller:
         except (IntegrityError, ValueError) as e:
             return get_serialized_exception(e)
 
+    @staticmethod
+    def get_changes(kwargs):
+        # None means "not given"; False, 0 and empty strings are real values.
+        return {attr: value for attr, value in kwargs.items() if value is not None}
+
     def edit(self, instance_id, **kwargs):
+        """
+        Write only the given columns. Raises `model.DoesNotExist` when there is no such row.
+        By default this is a single UPDATE that skips save() and its signals; see `full_save_on_edit`.
+        """
+        changes = self.get_changes(kwargs)
         try:
-            instance = self.model.objects.get(id=instance_id)
-            for attr, value in kwargs.items():
-                if value:
+            if self.full_save_on_edit:
+                instance = self.model.objects.get(id=instance_id)
+                for attr, value in changes.items():
                     setattr(instance, attr, value)
-            instance.save()
-            return None, instance
+                instance.save()
+                return None, instance
+
+            now = timezone.now()
+            for field in self.model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    changes.setdefault(field.attname, now)
+            if not self.model.objects.filter(pk=instance_id).update(**changes):
+                raise self.model.DoesNotExist(f"{self.model.__name__} {instance_id} does not exist")
+            invalidate_cache(self.model)
+            return None, self.get_edited_instance(instance_id, changes)
         except (IntegrityError, ValueError) as e:
             return get_serialized_exception(e)
 
+    def get_edited_instance(self, instance_id, changes):
+        """Instance holding the pk and the values just written; any other field is loaded on first access."""
+        pk = self.model._meta.pk
+        instance = self.model.from_db(router.db_for_write(self.model), [pk.attname], [pk.to_python(instance_id)])
+        for attr, value in changes.items():
+            setattr(instance, attr, value)
+        return instance
+
+    def has_write_side_effects(self):
+        # Subclasses that customise create/edit do more than write one row, so bulk writes must go through them.
+        return (self.full_save_on_edit or type(self).create is not Controller.create
+                or type(self).edit is not Controller.edit)
+
+    def bulk_create(self, items, batch_size=500):
+        """
+        Insert every item in one transaction, `batch_size` rows per INSERT.
+        Returns (errors, instances) where errors is a list of {"index", ...} entries; on any error nothing is written.
+        """
+        with transaction.atomic():
+            if self.has_write_side_effects():
+                errors, instances = [], []
+                for index, kwargs in enumerate(items):
+                    error, instance = self.create(**kwargs)
+                    if error:
+                        errors.append({"index": index, **error})
+                    instances.append(instance)
+                if errors:
+                    transaction.set_rollback(True)
+                    return errors, None
+                return None, instances
+
+            try:
+                instances = self.model.objects.bulk_create([self.model(**kwargs) for kwargs in items],
+                                                           batch_size=batch_size)
+            except (IntegrityError, ValueError, TypeError) as e:
+                transaction.set_rollback(True)
+                error, _ = get_serialized_exception(e)
+                return [{"index": None, **error}], None
+            invalidate_cache(self.model)
+            return None, instances
+
+    def bulk_edit(self, changes_by_pk, batch_size=500):
+        """
+        Apply {pk: kwargs} partial updates in one transaction, one UPDATE per batch of rows changing the same columns.
+        Same return shape as `bulk_create`, with "id" in place of "index".
+        """
+        with transaction.atomic():
+            if self.has_write_side_effects():
+                errors = []
+                for pk, kwargs in changes_by_pk.items():
+                    try:
+                        error, _ = self.edit(pk, **kwargs)
+                    except self.model.DoesNotExist as e:
+                        error, _ = get_serialized_exception(e)
+                    if error:
+                        errors.append({"id": pk, **error})
+                if errors:
+                    transaction.set_rollback(True)
+                    return errors, None
+                return None, list(changes_by_pk)
+
+            now = timezone.now()
+            auto_now = [field.attname for field in self.model._meta.concrete_fields
+                        if getattr(field, 'auto_now', False)]
+            groups = {}
+            for pk, kwargs in changes_by_pk.items():
+                changes = self.get_changes(kwargs)
+                for attname in auto_now:
+                    changes.setdefault(attname, now)
+                groups.setdefault(tuple(sorted(changes)), []).append(self.get_edited_instance(pk, changes))
+            try:
+                for fields, instances in groups.items():
+                    if fields:
+                        self.model.objects.bulk_update(instances, fields, batch_size=batch_size)
+            except (IntegrityError, ValueError, TypeError) as e:
+                transaction.set_rollback(True)
+                error, _ = get_serialized_exception(e)
+                return [{"id": None, **error}], None
+            invalidate_cache(self.model)
+            return None, list(changes_by_pk)
+
     def filter(self, **filters):
-        instance_qs = self.model.objects.all()
+        instance_qs = self.get_list_queryset()
         for attr, value in filters.items():
             if value is not None:
                 instance_qs = instance_qs.filter(**{attr: value})
@@ -51,7 +219,7 @@ class Controller:
 
     def get_instance_by_pk(self, pk: int):
         try:
-            instance = self.model.objects.get(pk=pk)
+            instance = self.get_queryset().get(pk=pk)
             return instance
         except self.model.DoesNotExist as e:
             return None
@@ -0,0 +1,66 @@
+import hashlib
+import threading
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import translation
+from django.utils.http import quote_etag
+
+from app.utils.helpers import get_data_for_field
+
+ENUM_CATALOG_FIELDS = (
+    'PropertyStatus',
+    'PaymentMethod',
+    'PaymentStatus',
+    'PaymentFor',
+    'DocumentStatus',
+    'ApprovalStatus',
+    # 'FileUploadStrategy',
+    # 'FileUploadStorage',
+    'FileUsageType',
+    'CRMDocumentType',
+    'Availability',
+    'PhaseStatus',
+    'PropertyType',
+    'AreaOfPurpose',
+    'AreaSizeUnit',
+    'Facing',
+    'SoilType',
+    'Role',
+)
+
+
+class EnumCatalog:
+    """
+    The `/get-enum-values/` payload, built once per locale and kept as encoded JSON with a content-hash ETag.
+    Enum definitions only change on deploy, so an entry lives as long as the worker process.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, locale):
+        """Return `(content, etag)` for the locale."""
+        entry = self._entries.get(locale)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(locale)
+                if entry is None:
+                    entry = self._entries[locale] = self.build(locale)
+        return entry
+
+    def build(self, locale):
+        data = {field: get_data_for_field(field=field, locale=locale) for field in self.fields}
+        # Labels are lazy strings; encode them while the locale is still active.
+        with translation.override(locale):
+            content = orjson.dumps(data, default=DjangoJSONEncoder().default)
+        return content, quote_etag(hashlib.md5(content).hexdigest())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+enum_catalog = EnumCatalog(ENUM_CATALOG_FIELDS)
@@ -0,0 +1,39 @@
+from django.utils.translation import get_language
+
+
+class FrozenDict(dict):
+    """A dict that can be shared between serialized payloads because nothing can change it in place."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("FrozenDict is immutable")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        # Cached payloads are pickled; rebuild from a plain dict instead of item by item.
+        return FrozenDict, (dict(self),)
+
+
+EMPTY_ENUM = FrozenDict()
+
+_lookup = {}
+
+
+def get_enum_lookup(enum_class, value):
+    """
+    Serialized form of `enum_class(value)` (see `get_serialized_enum`), built once per locale and shared.
+    Empty values (None, 0) map to an empty dict, as the serializers did before.
+    """
+    if not value:
+        return EMPTY_ENUM
+    key = (enum_class, value, get_language())
+    serialized = _lookup.get(key)
+    if serialized is None:
+        enum = enum_class(value)
+        serialized = _lookup[key] = FrozenDict({
+            "id": enum.value,
+            "name": enum.name,
+            "name_vernacular": str(enum.label),
+            "icon_url": "",
+        })
+    return serialized
@@ -1,3 +1,4 @@
+import base64
 import re
 import uuid
 from decimal import Decimal
@@ -11,6 +12,7 @@ from app.files.enums import FileUploadStrategy, FileUsageType, CRMDocumentType,
 from app.properties.enums import Availability, PhaseStatus, PropertyType, AreaOfPurpose, AreaSizeUnit, Facing, SoilType
 from app.users.enums import Role
 from app.utils.constants import CacheKeys, SMS
+from app.utils.enum_lookup import get_enum_lookup
 from app.utils.serializers import EnumValueSerializer
 
 
@@ -55,6 +57,22 @@ def allow_string_rep_of_enum(x):
     return int(x) if isinstance(x, str) else x
 
 
+def allow_list_of_enums(x):
+    """Accept `1,3`, repeated query params or a single value for a list-of-enum filter."""
+    values = x.split(',') if isinstance(x, str) else x if isinstance(x, (list, tuple)) else [x]
+    return [allow_string_rep_of_enum(value.strip() if isinstance(value, str) else value) for value in values
+            if value != '']
+
+
+def pack_bitmap(flags):
+    """Base64 of one bit per flag, least significant bit first (flag `i` is bit `i % 8` of byte `i // 8`)."""
+    packed = bytearray((len(flags) + 7) // 8)
+    for index, flag in enumerate(flags):
+        if flag:
+            packed[index >> 3] |= 1 << (index & 7)
+    return base64.b64encode(bytes(packed)).decode()
+
+
 def convert_to_decimal(x):
     """Convert value to decimal."""
     return Decimal(x)
@@ -65,6 +83,11 @@ def trim_mobile_no(x):
     return x[-10:]
 
 
+def normalize_search_query(x):
+    """Lowercase words only, single-spaced and capped, so equivalent searches share one cache entry."""
+    return " ".join(re.findall(r"\w+", str(x).lower()))[:100].strip()
+
+
 def send_sms(numbers, message):
     """Send SMS to given numbers with the specified message."""
     data = parse.urlencode({
@@ -107,13 +130,8 @@ def generate_random_username():
 
 
 def get_serialized_enum(enum, locale=None, field_name=None):
-    """Serialize enum data into a dictionary."""
-    return {
-        "id": enum.value,
-        "name": enum.name,
-        "name_vernacular": str(enum.label),
-        "icon_url": "",
-    }
+    """Serialize enum data into a dictionary (shared and read-only, see `get_enum_lookup`)."""
+    return get_enum_lookup(type(enum), enum.value)
 
 
 def format_value(value):
@@ -127,6 +145,11 @@ def format_value(value):
         return value
 
 
+def build_filter_params(**filters) -> str:
+    """Normalize list filters into an order-independent `key=value` string for cache keys."""
+    return "&".join(f"{key}={format_value(value)}" for key, value in sorted(filters.items()))
+
+
 def build_cache_key(template_type: CacheKeys, **kwargs) -> str:
     """
     Centralized method to generate cache keys based on a template type and the provided keyword arguments.
@@ -0,0 +1,119 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+
+class LocalCache:
+    """
+    Bounded per-process LRU with a TTL on every entry.
+    Used in front of Redis so hot reads can be answered without any network I/O.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class InvalidationListener:
+    """
+    Subscribes each worker process to the invalidation channel and drops the local generation of every model
+    published there. The local tier is only trusted while the subscription is up: on any connection error the
+    local generations are cleared and reads go back to Redis until the listener has resubscribed.
+    """
+
+    def __init__(self, generations):
+        self.generations = generations
+        self.connected = False
+        self.epoch = 0
+        self._pid = None
+
+    def ensure_started(self):
+        # Gunicorn forks workers after import, so every process starts its own listener.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.connected = False
+        threading.Thread(target=self._listen, name="cache-invalidation-listener", daemon=True).start()
+
+    def _listen(self):
+        from django_redis import get_redis_connection
+
+        while True:
+            try:
+                pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were not subscribed is lost, so start from a clean slate.
+                self.generations.clear()
+                self.connected = True
+                for message in pubsub.listen():
+                    self.epoch += 1
+                    for label in message["data"].decode().split(","):
+                        self.generations.delete(label)
+            except Exception:  # noqa
+                logger.warning("Cache invalidation listener disconnected, retrying", exc_info=True)
+            self.connected = False
+            self.epoch += 1
+            self.generations.clear()
+            time.sleep(1)
+
+
+local_cache = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TIMEOUT)
+local_generations = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TIMEOUT)
+invalidation_listener = InvalidationListener(local_generations)
+
+
+def local_tier_active():
+    if not settings.LOCAL_CACHE_ENABLED:
+        return False
+    invalidation_listener.ensure_started()
+    return invalidation_listener.connected
+
+
+def publish_invalidation(labels):
+    """Tell every worker's local tier that these models have a new generation."""
+    if not settings.LOCAL_CACHE_ENABLED:
+        return
+    from django_redis import get_redis_connection
+
+    try:
+        get_redis_connection("default").publish(INVALIDATION_CHANNEL, ",".join(labels))
+    except Exception:  # noqa
+        # Local generations still expire after LOCAL_CACHE_TIMEOUT.
+        logger.warning("Could not publish cache invalidation for %s", labels, exc_info=True)
@@ -1,10 +1,21 @@
+import base64
+import json
 from collections import OrderedDict
 
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+MAX_PAGE_SIZE = 100
 
 
 class CustomPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
     def paginate_queryset(self, queryset, request, view=None):
         # Check if 'page' query parameter is set to 'all'
         if request.query_params.get('page', '').lower() == 'all':
@@ -15,16 +26,119 @@ class CustomPageNumberPagination(PageNumberPagination):
             self.return_all = False  # Normal pagination path
             return super().paginate_queryset(queryset, request, view=view)
 
-    def get_paginated_response(self, data):
+    def get_page_key(self, request):
+        """Normalized page identifier for cache keys: missing means the first page, `all` is case-insensitive."""
+        page = request.query_params.get(self.page_query_param) or '1'
+        return page.lower()
+
+    def get_paginated_data(self, data):
         # If all items are being returned, don't include pagination details
         if getattr(self, 'return_all', False):
-            return Response(OrderedDict([
+            return OrderedDict([
                 ('count', len(data)),
                 ('next', ''),
                 ('previous', ''),
                 ('page_size', self.page_size),
                 ('results', data)
-            ]))
+            ])
+        return OrderedDict([
+            ('count', self.page.paginator.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over `(ordering_field, id)`, newest first.
+    Each page is a single indexed range scan: no COUNT and no OFFSET, so deep pages cost the same as the first.
+    A viewset can key on another column by setting `cursor_ordering_field`, e.g. `updated_at`.
+    """
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering_field = 'created_at'
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True,
+                                 cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_page_key(self, request):
+        return request.query_params.get(self.cursor_query_param) or ''
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            value = self.field.to_python(value)
+            pk = int(pk)
+        except (TypeError, ValueError, ValidationError):
+            # A tampered or stale cursor starts over from the first page.
+            return None
+        if value is None:
+            # created_at__lt=None is not a valid filter either
+            return None
+        return value, pk, bool(reverse)
+
+    def encode_cursor(self, instance, reverse):
+        value = self.field.value_to_string(instance)
+        cursor = base64.urlsafe_b64encode(json.dumps([value, instance.pk, reverse]).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        ordering_field = getattr(view, 'cursor_ordering_field', self.ordering_field)
+        self.field = queryset.model._meta.get_field(ordering_field)
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            rows = list(queryset.order_by(f'-{ordering_field}', '-pk')[:self.page_size + 1])
+            self.has_next, self.has_previous = len(rows) > self.page_size, False
+        elif cursor[2]:
+            # Walking backwards: read the rows just above the cursor in ascending order, then flip them.
+            value, pk, _ = cursor
+            after = Q(**{f'{ordering_field}__gt': value}) | Q(**{ordering_field: value, 'pk__gt': pk})
+            rows = list(queryset.filter(after).order_by(ordering_field, 'pk')[:self.page_size + 1])
+            self.has_next, self.has_previous = True, len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
         else:
-            # Normal paginated response
-            return super().get_paginated_response(data)
+            value, pk, _ = cursor
+            before = Q(**{f'{ordering_field}__lt': value}) | Q(**{ordering_field: value, 'pk__lt': pk})
+            rows = list(queryset.filter(before).order_by(f'-{ordering_field}', '-pk')[:self.page_size + 1])
+            self.has_next, self.has_previous = len(rows) > self.page_size, True
+
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
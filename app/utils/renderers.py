@@ -0,0 +1,57 @@
+import msgpack
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson encodes datetimes itself; pass them through so the encoder classes below keep formatting them.
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def get_default(renderer_context, encoder_class):
+    """
+    `default` hook for types orjson/msgpack can't encode natively (Decimal, datetime, lazy strings...).
+    It delegates to the stdlib encoder class the response used before, so the output values are unchanged.
+    A view can pass `encoder_class` in the renderer context, e.g. DjangoJSONEncoder for JsonResponse payloads.
+    """
+    encoder_class = (renderer_context or {}).get('encoder_class', encoder_class)
+    return encoder_class().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=get_default(renderer_context, self.encoder_class), option=ORJSON_OPTIONS)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Same payloads as ORJSONRenderer, for clients sending `Accept: application/msgpack`."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=get_default(renderer_context, self.encoder_class), use_bin_type=True,
+                             datetime=False)
+
+
+class ORJSONResponse(JsonResponse):
+    """Drop-in `JsonResponse` encoded with orjson; `encoder` still decides how non-JSON types are represented."""
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError("In order to allow non-dict objects to be serialized set the safe parameter to False.")
+        kwargs.setdefault('content_type', 'application/json')
+        content = orjson.dumps(data, default=encoder().default, option=ORJSON_OPTIONS)
+        super(JsonResponse, self).__init__(content=content, **kwargs)
@@ -1,6 +1,10 @@
 from django.conf import settings
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from app.files.images import IMAGE_VARIANT_SIZES
+from app.utils.enum_lookup import get_enum_lookup
+
 
 class EnumValueSerializer(serializers.Serializer):
     id = serializers.SerializerMethodField()
@@ -28,3 +32,141 @@ class EnumValueSerializer(serializers.Serializer):
         if self.field:
             return f"{settings.MEDIA_URL}icons/{self.field}/{enum.name.lower()}.svg"
         return None
+
+
+class EnumField(serializers.Field):
+    """Read-only choice field rendered as the shared `get_serialized_enum` dict; empty values render as `{}`."""
+
+    def __init__(self, enum_class, **kwargs):
+        self.enum_class = enum_class
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        # Resolve here: DRF would render a None attribute as null without calling to_representation.
+        return get_enum_lookup(self.enum_class, super().get_attribute(instance))
+
+    def to_representation(self, value):
+        return value
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    srcset-style map of an image's resized variants, `{"thumb": {"width", "height", "webp", "jpeg"}, ...}` with
+    URLs for the formats. `{}` until they are generated for the current original (see app.files.images).
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        variants = getattr(instance, f'{self.image_field}_variants') or {}
+        if not image or variants.get('source') != image.name:
+            return {}
+        # Smallest first whatever order the JSON column kept the keys in (jsonb sorts them by length)
+        sizes = variants['sizes']
+        return {
+            size: {'width': sizes[size]['width'], 'height': sizes[size]['height'],
+                   **{image_format: image.storage.url(name) for image_format, name in sizes[size]['files'].items()}}
+            for size in IMAGE_VARIANT_SIZES if size in sizes
+        }
+
+
+def parse_field_tree(value):
+    """Parse `a,b.c,b.d` (from `?fields=` / `?expand=`) into `{"a": {}, "b": {"c": {}, "d": {}}}`."""
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def format_field_tree(tree):
+    """Canonical, order-independent string for a field tree, for cache keys."""
+    return ",".join(f"{name}({format_field_tree(tree[name])})" if tree[name] else name for name in sorted(tree))
+
+
+def get_nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def get_sparse_serializer(serializer_class, fields, expand):
+    """
+    Subclass of `serializer_class` that renders only `fields` (all when empty). Nested serializers are rendered
+    only when named in `expand` or given sub-fields; otherwise they collapse to the related primary key(s).
+    """
+
+    class SparseSerializer(serializer_class):
+        def get_fields(self):
+            return prune_fields(super().get_fields(), fields, expand)
+
+    SparseSerializer.__name__ = serializer_class.__name__
+    return SparseSerializer
+
+
+def prune_fields(all_fields, fields, expand):
+    pruned = {}
+    for name, field in all_fields.items():
+        if fields and name not in fields:
+            continue
+        nested = get_nested_serializer(field)
+        if nested is None:
+            pruned[name] = field
+            continue
+
+        many = nested is not field
+        if name in expand or fields.get(name):
+            sparse_class = get_sparse_serializer(type(nested), fields.get(name, {}), expand.get(name, {}))
+            pruned[name] = sparse_class(*nested._args, many=many, **nested._kwargs) if many else \
+                sparse_class(*nested._args, **nested._kwargs)
+        else:
+            kwargs = {'source': field._kwargs['source']} if 'source' in field._kwargs else {}
+            pruned[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, **kwargs)
+    return pruned
+
+
+def prune_lookups(serializer_class, lookups, fields, expand):
+    """
+    Cut select_related/prefetch_related lookups down to what a sparse `serializer_class` will actually read.
+    Lookups through collapsed to-many relations keep only their first step, which is enough for the id list.
+    Anything the serializer tree cannot account for (method fields, dotted sources) is kept as is.
+    """
+    pruned = []
+    for lookup in lookups:
+        path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        parts = path.split('__')
+        kept = prune_lookup_path(serializer_class(), parts, fields, expand)
+        if kept == parts:
+            pruned.append(lookup)
+        elif kept and '__'.join(kept) not in pruned:
+            pruned.append('__'.join(kept))
+    return tuple(pruned)
+
+
+def prune_lookup_path(serializer, parts, fields, expand):
+    kept = []
+    for part in parts:
+        by_source = {field.source: (name, field) for name, field in serializer.fields.items()}
+        if part not in by_source:
+            return parts
+        name, field = by_source[part]
+        if fields and name not in fields:
+            return kept
+        nested = get_nested_serializer(field)
+        if nested is None:
+            # Read by a plain or method field: keep the rest of the lookup.
+            return parts
+        if not (name in expand or fields.get(name)):
+            return kept + [part] if nested is not field else kept
+        kept.append(part)
+        serializer, fields, expand = nested, fields.get(name, {}), expand.get(name, {})
+    return kept
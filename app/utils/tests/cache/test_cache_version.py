@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from app.crm.enums import PropertyStatus, ApprovalStatus
+from app.crm.models import CRMLead
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.users.models import Customer
+from app.utils.cache import get_cache_version, bump_cache_version
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_only_the_bumped_model_version(self):
+        plot_version = get_cache_version((Plot,))
+        phase_version = get_cache_version((Phase,))
+
+        bump_cache_version(Plot)
+
+        self.assertNotEqual(plot_version, get_cache_version((Plot,)))
+        self.assertEqual(phase_version, get_cache_version((Phase,)))
+
+    def test_save_bumps_version_on_commit(self):
+        version = get_cache_version((Property,))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+
+        self.assertNotEqual(version, get_cache_version((Property,)))
+
+    def test_crm_lead_save_cascade_bumps_plot_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+            phase = Phase.objects.create(property=property, phase_number=1)
+            plot = Plot.objects.create(phase=phase, plot_number=1, price=100, area_size=10)
+            lead = CRMLead.objects.create(property=property, phase=phase, plot=plot,
+                                          customer=Customer.objects.create(name="Customer"))
+        version = get_cache_version((Plot,))
+
+        lead.current_crm_status = PropertyStatus.DOCUMENT_DELIVERY
+        lead.current_approval_status = ApprovalStatus.COMPLETED
+        with self.captureOnCommitCallbacks(execute=True):
+            lead.save()
+
+        self.assertNotEqual(version, get_cache_version((Plot,)))
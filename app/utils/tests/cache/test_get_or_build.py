@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from app.utils.cache import get_or_build
+from app.utils.constants import CacheKeys
+
+
+class GetOrBuildTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.build = mock.Mock(return_value={"id": 1})
+
+    def test_fresh_entry_is_built_once(self):
+        self.assertEqual({"id": 1}, get_or_build("key", self.build))
+        self.assertEqual({"id": 1}, get_or_build("key", self.build))
+
+        self.build.assert_called_once()
+
+    def test_stale_entry_is_served_while_another_worker_rebuilds(self):
+        get_or_build("key", self.build, timeout=0)
+        cache.add(CacheKeys.REBUILD_LOCK.value.format(key="key"), 1)
+
+        self.assertEqual({"id": 1}, get_or_build("key", mock.Mock(return_value={"id": 2})))
+
+    def test_stale_entry_is_rebuilt_by_the_lock_winner(self):
+        get_or_build("key", self.build, timeout=0)
+
+        self.assertEqual({"id": 2}, get_or_build("key", mock.Mock(return_value={"id": 2})))
+
+    def test_none_is_not_cached(self):
+        build = mock.Mock(return_value=None)
+
+        self.assertIsNone(get_or_build("key", build))
+        self.assertIsNone(get_or_build("key", build))
+
+        self.assertEqual(2, build.call_count)
@@ -0,0 +1,27 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app.utils.local_cache import LocalCache
+
+
+class LocalCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        local_cache = LocalCache(max_entries=2, timeout=30)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        local_cache.get("a")
+
+        local_cache.set("c", 3)
+
+        self.assertEqual(1, local_cache.get("a"))
+        self.assertIsNone(local_cache.get("b"))
+        self.assertEqual(3, local_cache.get("c"))
+
+    def test_expired_entry_is_not_returned(self):
+        local_cache = LocalCache(max_entries=2, timeout=30)
+        with mock.patch("app.utils.local_cache.time.monotonic", return_value=100):
+            local_cache.set("a", 1)
+
+        with mock.patch("app.utils.local_cache.time.monotonic", return_value=131):
+            self.assertIsNone(local_cache.get("a"))
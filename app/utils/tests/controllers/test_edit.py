@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from app.crm.controllers import PaymentController
+from app.crm.enums import PaymentFor
+from app.crm.models import CRMLead, Payment
+from app.properties.controllers import PlotController
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.users.models import Customer
+
+
+class EditTests(TestCase):
+    def setUp(self):
+        self.property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        self.phase = Phase.objects.create(property=self.property, phase_number=1)
+        self.plot = Plot.objects.create(phase=self.phase, plot_number=7, is_corner_site=True)
+
+    def test_partial_edit_is_a_single_update(self):
+        with self.captureOnCommitCallbacks(), self.assertNumQueries(1):
+            errors, instance = PlotController().edit(self.plot.pk, plot_number=0, is_corner_site=False, price=None)
+
+        self.assertIsNone(errors)
+        self.assertEqual(self.plot.pk, instance.pk)
+        self.plot.refresh_from_db()
+        self.assertEqual(0, self.plot.plot_number)
+        self.assertFalse(self.plot.is_corner_site)
+
+    def test_partial_edit_of_missing_row_raises(self):
+        with self.assertRaises(Plot.DoesNotExist):
+            PlotController().edit(self.plot.pk + 1, plot_number=1)
+
+    def test_full_save_on_edit_runs_save(self):
+        lead = CRMLead.objects.create(property=self.property, customer=Customer.objects.create(name="Asha"))
+        payment = Payment.objects.create(crm_lead=lead, amount=100, payment_for=PaymentFor.TOKEN)
+        Payment.objects.filter(pk=payment.pk).update(backend_reference_number=None)
+
+        errors, _ = PaymentController().edit(payment.pk, amount=200)
+
+        self.assertIsNone(errors)
+        payment.refresh_from_db()
+        self.assertEqual(200, payment.amount)
+        self.assertIsNotNone(payment.backend_reference_number)
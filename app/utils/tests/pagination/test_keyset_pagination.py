@@ -0,0 +1,61 @@
+import base64
+import json
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.utils.pagination import KeysetPagination
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        phase = Phase.objects.create(property=property, phase_number=1)
+        self.plots = [Plot.objects.create(phase=phase, plot_number=number) for number in range(7)]
+        # Ties on created_at must be broken by id.
+        Plot.objects.update(created_at=self.plots[0].created_at)
+
+    def paginate(self, url):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(Plot.objects.all(), Request(self.factory.get(url)))
+        return [plot.plot_number for plot in page], paginator.get_paginated_data([])
+
+    def test_walks_forward_and_back_without_count(self):
+        with self.assertNumQueries(1):
+            first, data = self.paginate("/plots/?page_size=3")
+        self.assertEqual([6, 5, 4], first)
+        self.assertIsNone(data["previous"])
+
+        second, data = self.paginate(data["next"])
+        self.assertEqual([3, 2, 1], second)
+
+        last, last_data = self.paginate(data["next"])
+        self.assertEqual([0], last)
+        self.assertIsNone(last_data["next"])
+
+        back, _ = self.paginate(data["previous"])
+        self.assertEqual([6, 5, 4], back)
+
+    def test_page_size_is_bounded(self):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get("/plots/", {"page_size": 10000}))
+        self.assertEqual(paginator.max_page_size, paginator.get_page_size(request))
+
+    def test_invalid_cursor_starts_from_the_first_page(self):
+        page, _ = self.paginate("/plots/?cursor=not-a-cursor")
+        self.assertEqual([6, 5, 4, 3], page)
+
+    def test_well_formed_cursor_with_invalid_value_starts_from_the_first_page(self):
+        cursor = base64.urlsafe_b64encode(json.dumps(["garbage", 1, False]).encode()).decode()
+        page, _ = self.paginate(f"/plots/?cursor={cursor}")
+        self.assertEqual([6, 5, 4, 3], page)
+
+    def test_cursor_with_a_null_value_starts_from_the_first_page(self):
+        for reverse in (False, True):
+            cursor = base64.urlsafe_b64encode(json.dumps([None, 1, reverse]).encode()).decode()
+            page, _ = self.paginate(f"/plots/?cursor={cursor}")
+            self.assertEqual([6, 5, 4, 3], page)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.utils.timezone import now
+
+from app.crm.controllers import CRMLeadController, PaymentController, StatusChangeRequestController
+from app.crm.enums import ApprovalStatus, PaymentFor, PropertyStatus
+from app.crm.models import CRMLead, Payment, StatusChangeRequest
+from app.properties.controllers import PlotController
+from app.properties.tests import create_property_tree
+from app.users.controllers import CustomerController
+from app.users.models import Customer
+
+
+class ListFilterIndexTests(TestCase):
+    """
+    EXPLAIN each hot list filter on a seeded dataset and check the planner picks the index meant for it.
+    On PostgreSQL sequential scans are disabled for the check, a handful of rows would never justify an index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # A few sales officers, each with leads spread over every stage, most of them long closed
+        statuses, payment_kinds = list(PropertyStatus), list(PaymentFor)
+        for index in range(4):
+            property = create_property_tree(index)
+            phase = property.phases.get()
+            Customer.objects.filter(pk=property.current_lead_id).update(mobile_no=f"98765432{index:02}")
+            leads = CRMLead.objects.bulk_create(
+                CRMLead(property=property, phase=phase, plot=phase.plots.get(), customer=property.current_lead,
+                        assigned_so=property.created_by, current_crm_status=statuses[n % len(statuses)],
+                        is_active=n % 5 == 0)
+                for n in range(50)
+            )
+            Payment.objects.bulk_create(Payment(crm_lead=lead, amount=100, payment_for=payment_kinds[n % 2])
+                                        for lead in leads for n in range(2))
+            StatusChangeRequest.objects.bulk_create(
+                StatusChangeRequest(crm_lead=lead, requested_status=status)
+                for lead in leads[:10] for status in statuses
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.lead = leads[0]
+
+    def explain(self, queryset):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+
+    def assertUsesIndex(self, index_name, queryset):
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan, f"{index_name} not used:\n{plan}")
+
+    def filter(self, controller, **filters):
+        errors, queryset = controller.filter(**filters)
+        self.assertIsNone(errors)
+        return queryset
+
+    def test_crm_lead_list_by_sales_officer(self):
+        queryset = self.filter(CRMLeadController(), assigned_so_id=self.lead.assigned_so_id, is_active=True,
+                               current_crm_status=PropertyStatus.TOKEN_ADVANCE)
+        self.assertUsesIndex('crmlead_so_active_status_idx', queryset)
+
+    def test_payment_list_by_lead_and_purpose(self):
+        queryset = self.filter(PaymentController(), crm_lead_id=self.lead.pk, payment_for=PaymentFor.TOKEN)
+        self.assertUsesIndex('payment_lead_payment_for_idx', queryset)
+
+    def test_status_change_request_list_by_lead_and_status(self):
+        queryset = self.filter(StatusChangeRequestController(), crm_lead_id=self.lead.pk,
+                               requested_status=PropertyStatus.TOKEN_ADVANCE, approval_status=ApprovalStatus.PENDING)
+        self.assertUsesIndex('statuschange_lead_status_idx', queryset)
+
+    def test_customer_list_by_mobile_no(self):
+        queryset = self.filter(CustomerController(), mobile_no='9876543201')
+        self.assertUsesIndex('customer_mobile_no_idx', queryset)
+
+    def test_plot_list_by_phase(self):
+        queryset = self.filter(PlotController(), phase_id=self.lead.phase_id)
+        self.assertUsesIndex('plot_available_phase_idx', queryset)
+
+    def test_stale_lead_deactivation(self):
+        queryset = CRMLead.objects.filter(updated_at__lt=now() - timedelta(days=90), is_active=True)
+        self.assertUsesIndex('crmlead_active_updated_at_idx', queryset)
@@ -0,0 +1,59 @@
+import datetime
+import json
+from decimal import Decimal
+
+import msgpack
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import TestCase, SimpleTestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.properties.views import PlotViewSet
+from app.utils.renderers import MessagePackRenderer, ORJSONRenderer, ORJSONResponse
+
+PAYLOAD = {
+    "price": Decimal("1250.50"),
+    "created_at": timezone.make_aware(datetime.datetime(2024, 5, 27, 14, 47, 3, 123456), datetime.timezone.utc),
+    "date": datetime.date(2024, 5, 27),
+    "results": [{"id": 1, "name": "Sunset Vistas"}],
+}
+
+
+class RendererTests(SimpleTestCase):
+    def test_orjson_renderer_matches_drf_json_renderer(self):
+        self.assertEqual(json.loads(JSONRenderer().render(PAYLOAD)), json.loads(ORJSONRenderer().render(PAYLOAD)))
+
+    def test_msgpack_renderer_carries_the_same_values(self):
+        expected = json.loads(JSONRenderer().render(PAYLOAD))
+        self.assertEqual(expected, msgpack.unpackb(MessagePackRenderer().render(PAYLOAD)))
+
+    def test_orjson_response_matches_json_response(self):
+        self.assertEqual(json.loads(JsonResponse(PAYLOAD).content), json.loads(ORJSONResponse(PAYLOAD).content))
+
+
+class NegotiationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        phase = Phase.objects.create(property=property, phase_number=1)
+        self.plot = Plot.objects.create(phase=phase, plot_number=1, price="1250.50")
+
+    def test_list_and_retrieve_negotiate_msgpack(self):
+        list_view = PlotViewSet.as_view({"get": "list"})
+        retrieve_view = PlotViewSet.as_view({"get": "retrieve"})
+
+        json_list = list_view(self.factory.get("/plots/")).render()
+        msgpack_list = list_view(self.factory.get("/plots/", HTTP_ACCEPT="application/msgpack")).render()
+        msgpack_detail = retrieve_view(self.factory.get("/plots/", HTTP_ACCEPT="application/msgpack"),
+                                       pk=self.plot.pk)
+
+        self.assertEqual("application/msgpack", msgpack_list["Content-Type"])
+        self.assertEqual(json.loads(json_list.content), msgpack.unpackb(msgpack_list.content))
+        self.assertNotEqual(json_list["ETag"], msgpack_list["ETag"])
+        self.assertEqual("Accept", msgpack_list["Vary"])
+        self.assertEqual("1250.50", msgpack.unpackb(msgpack_detail.content)["price"])
@@ -0,0 +1,36 @@
+import pickle
+
+from django.test import SimpleTestCase
+from django.utils import translation
+
+from app.properties.enums import Facing
+from app.properties.serializers import PlotSerializerSimple
+from app.properties.models import Plot
+from app.utils.enum_lookup import get_enum_lookup
+
+
+class EnumLookupTests(SimpleTestCase):
+    def test_serialized_enums_are_shared_and_read_only(self):
+        first = get_enum_lookup(Facing, Facing.EAST)
+        second = get_enum_lookup(Facing, int(Facing.EAST))
+
+        self.assertIs(first, second)
+        self.assertEqual({"id": Facing.EAST.value, "name": "EAST", "name_vernacular": str(Facing.EAST.label),
+                          "icon_url": ""}, first)
+        with self.assertRaises(TypeError):
+            first["name"] = "WEST"
+        self.assertEqual(first, pickle.loads(pickle.dumps(first)))
+
+    def test_entries_are_per_locale(self):
+        with translation.override("en-us"):
+            english = get_enum_lookup(Facing, Facing.EAST)
+        with translation.override("fr-fr"):
+            french = get_enum_lookup(Facing, Facing.EAST)
+
+        self.assertIsNot(english, french)
+
+    def test_enum_field_renders_empty_values_as_empty_dict(self):
+        data = PlotSerializerSimple(Plot(facing=None, soil_type=None, availability=Facing.EAST)).data
+
+        self.assertEqual({}, data["facing"])
+        self.assertEqual({}, data["soil_type"])
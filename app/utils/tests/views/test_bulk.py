@@ -0,0 +1,67 @@
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.properties.views import PlotViewSet
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        self.phase = Phase.objects.create(property=property, phase_number=1)
+
+    def bulk_create(self, data, **initkwargs):
+        view = PlotViewSet.as_view({"post": "bulk_create"}, **initkwargs)
+        return view(self.factory.post("/plots/bulk_create/", data, format="json"))
+
+    def bulk_partial_update(self, data):
+        view = PlotViewSet.as_view({"patch": "bulk_partial_update"})
+        return view(self.factory.patch("/plots/bulk_partial_update/", data, format="json"))
+
+    def test_bulk_create_inserts_in_batches(self):
+        items = [{"phase_id": self.phase.pk, "plot_number": number, "price": "100.00"} for number in range(5)]
+        # savepoint, three INSERT batches, release, then the phase aggregates: lock and one UPDATE
+        with self.captureOnCommitCallbacks(), self.assertNumQueries(7):
+            response = self.bulk_create(items, bulk_batch_size=2)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(list(range(5)), sorted(Plot.objects.values_list("plot_number", flat=True)))
+
+    def test_bulk_create_reports_invalid_items_and_writes_nothing(self):
+        response = self.bulk_create([
+            {"phase_id": self.phase.pk, "plot_number": 1},
+            {"phase_id": self.phase.pk},
+        ])
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual([1], [error["index"] for error in json.loads(response.content)["errors"]])
+        self.assertFalse(Plot.objects.exists())
+
+    def test_bulk_partial_update(self):
+        plots = [Plot.objects.create(phase=self.phase, plot_number=number, is_corner_site=True) for number in range(3)]
+
+        response = self.bulk_partial_update([
+            {"id": plot.pk, "phase_id": self.phase.pk, "plot_number": plot.plot_number + 10, "is_corner_site": False,
+             "area_size_unit": 1}
+            for plot in plots
+        ])
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([(10, False), (11, False), (12, False)],
+                         list(Plot.objects.order_by("pk").values_list("plot_number", "is_corner_site")))
+
+    def test_bulk_partial_update_rejects_unknown_ids(self):
+        plot = Plot.objects.create(phase=self.phase, plot_number=1)
+
+        response = self.bulk_partial_update([
+            {"id": plot.pk, "phase_id": self.phase.pk, "plot_number": 2, "area_size_unit": 1},
+            {"id": plot.pk + 1, "phase_id": self.phase.pk, "plot_number": 3, "area_size_unit": 1},
+        ])
+
+        self.assertEqual(400, response.status_code)
+        plot.refresh_from_db()
+        self.assertEqual(1, plot.plot_number)
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.properties.views import PlotViewSet
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        self.phase = Phase.objects.create(property=property, phase_number=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plot = Plot.objects.create(phase=self.phase, plot_number=1)
+
+    def test_matching_etag_returns_304_without_queries(self):
+        view = PlotViewSet.as_view({"get": "retrieve"})
+        etag = view(self.factory.get("/plots/"), pk=self.plot.pk)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = view(self.factory.get("/plots/", HTTP_IF_NONE_MATCH=etag), pk=self.plot.pk)
+
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    def test_write_changes_list_etag(self):
+        view = PlotViewSet.as_view({"get": "list"})
+        etag = view(self.factory.get("/plots/"))["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Plot.objects.create(phase=self.phase, plot_number=2)
+        response = view(self.factory.get("/plots/", HTTP_IF_NONE_MATCH=etag))
+
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response["ETag"])
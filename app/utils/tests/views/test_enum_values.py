@@ -0,0 +1,39 @@
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from app.users.models import User
+from app.utils.enum_catalog import enum_catalog, ENUM_CATALOG_FIELDS
+from app.utils.views import get_enum_values
+
+
+class EnumValuesTests(TestCase):
+    def setUp(self):
+        enum_catalog.clear()
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create(name="Asha")
+
+    def get(self, **headers):
+        request = self.factory.get("/get-enum-values/", **headers)
+        request.LANGUAGE_CODE = "en-us"
+        force_authenticate(request, user=self.user)
+        return get_enum_values(request)
+
+    def test_catalog_is_built_once_and_served_with_an_etag(self):
+        first = self.get()
+        with self.assertNumQueries(0):
+            second = self.get()
+
+        self.assertEqual(first.content, second.content)
+        data = json.loads(first.content)
+        self.assertEqual(list(ENUM_CATALOG_FIELDS), list(data))
+        roles = {value["name"]: value["name_vernacular"] for value in data["Role"]["values"]}
+        self.assertEqual("Sales Officer", roles["SALES_OFFICER"])
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
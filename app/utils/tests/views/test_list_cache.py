@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.properties.views import PlotViewSet
+
+
+class ListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.view = PlotViewSet.as_view({"get": "list"})
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        phase = Phase.objects.create(property=property, phase_number=1)
+        for plot_number in range(6):
+            Plot.objects.create(phase=phase, plot_number=plot_number)
+
+    def test_cache_hit_returns_the_page_envelope_without_queries(self):
+        miss = self.view(self.factory.get("/plots/", {"page": 1})).render()
+
+        with self.assertNumQueries(0):
+            hit = self.view(self.factory.get("/plots/")).render()
+
+        self.assertEqual(miss.content, hit.content)
+        self.assertEqual(6, hit.data["count"])
+        self.assertEqual(["count", "next", "previous", "results"], list(hit.data))
+
+    def test_pages_are_cached_separately(self):
+        first = self.view(self.factory.get("/plots/", {"page": 1})).render()
+        second = self.view(self.factory.get("/plots/", {"page": 2})).render()
+
+        self.assertNotEqual(first.data["results"], second.data["results"])
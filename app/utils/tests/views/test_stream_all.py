@@ -0,0 +1,46 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from app.properties.enums import PropertyType
+from app.properties.models import Property, Phase, Plot
+from app.properties.views import PlotViewSet, PhaseViewSet
+
+
+class StreamAllTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        property = Property.objects.create(property_type=PropertyType.DTCP_PLOTS, name="Sunset Vistas")
+        self.phases = [Phase.objects.create(property=property, phase_number=number) for number in range(3)]
+        for plot_number in range(7):
+            Plot.objects.create(phase=self.phases[plot_number % 3], plot_number=plot_number, price="1250.50")
+
+    def get_all(self, viewset, **initkwargs):
+        view = viewset.as_view({"get": "list"}, **initkwargs)
+        response = view(self.factory.get("/", {"page": "all"}))
+        self.assertTrue(response.streaming)
+        return response, json.loads(b"".join(response.streaming_content))
+
+    def test_streams_the_page_all_envelope_in_chunks(self):
+        response, data = self.get_all(PlotViewSet, stream_chunk_size=3)
+
+        self.assertEqual(7, data["count"])
+        self.assertEqual(["count", "next", "previous", "page_size", "results"], list(data))
+        self.assertEqual(list(range(7)), sorted(plot["plot_number"] for plot in data["results"]))
+        self.assertEqual("1250.50", data["results"][0]["price"])
+        self.assertTrue(response.has_header("ETag"))
+
+    def test_streams_querysets_with_prefetches(self):
+        _, data = self.get_all(PhaseViewSet, stream_chunk_size=2)
+
+        self.assertEqual(3, len(data["results"]))
+
+    def test_streams_an_empty_result(self):
+        Plot.objects.all().delete()
+
+        _, data = self.get_all(PlotViewSet)
+
+        self.assertEqual({"count": 0, "next": "", "previous": "", "page_size": 4, "results": []}, data)
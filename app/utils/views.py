@@ -1,10 +1,22 @@
-from django.core.cache import cache
-from django.http import JsonResponse
+import calendar
+import hashlib
+from itertools import islice
+
+from django.db.models import Count, Max
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
-from app.utils.constants import Timeouts
-from app.utils.helpers import build_cache_key, qdict_to_dict, get_data_for_field
+from rest_framework.response import Response
+from app.utils.cache import get_cache_version, get_or_build
+from app.utils.enum_catalog import enum_catalog
+from app.utils.helpers import build_cache_key, build_filter_params, qdict_to_dict
 from app.utils.pagination import CustomPageNumberPagination
+from app.utils.renderers import MessagePackRenderer, ORJSONRenderer, ORJSONResponse
+from app.utils.serializers import format_field_tree, get_sparse_serializer, parse_field_tree
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 
@@ -13,8 +25,6 @@ from rest_framework.authentication import TokenAuthentication
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_enum_values(request):
-    # TODO Not the best way. Think for a better solution.
-
     """
         Serves GET requests given on the entity API root path which provide all enums values
         GET /api/get-enum-values
@@ -22,125 +32,297 @@ def get_enum_values(request):
         :return:
     """
 
-    locale = request.LANGUAGE_CODE
-    fields = (
-        'PropertyStatus',
-        'PaymentMethod',
-        'PaymentStatus',
-        'PaymentFor',
-        'DocumentStatus',
-        'ApprovalStatus',
-        # 'FileUploadStrategy',
-        # 'FileUploadStorage',
-        'FileUsageType',
-        'CRMDocumentType',
-        'Availability',
-        'PhaseStatus',
-        'PropertyType',
-        'AreaOfPurpose',
-        'AreaSizeUnit',
-        'Facing',
-        'SoilType',
-        'Role',
-    )
-
-    data = {}
-    for field in fields:
-        data[field] = get_data_for_field(field=field, locale=locale)
-    return JsonResponse(data=data, status=status.HTTP_200_OK)
+    content, etag = enum_catalog.get(request.LANGUAGE_CODE)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    response = HttpResponse(content, content_type='application/json', status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    return response
 
 
 class BaseViewSet(viewsets.ViewSet):
     controller = None
     serializer = None
+    list_serializer = None  # compact serializer for list responses; `serializer` is used when unset
     create_schema = None
     update_schema = None
     list_schema = None
     cache_key_retrieve = None
     cache_key_list = None
+    cache_models = ()
+    local_cache_retrieve = False
+    pagination_class = CustomPageNumberPagination  # or KeysetPagination, see cursor_ordering_field
+    bulk_batch_size = 500
+    stream_chunk_size = 200
+    bulk_max_items = 5000
 
     def create(self, request, *args, **kwargs):
         errors, data = self.controller.parse_request(self.create_schema, request.data)
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
 
         errors, instance = self.controller.create(**data.dict())
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return JsonResponse(data={"id": instance.pk}, status=status.HTTP_201_CREATED)
+        return ORJSONResponse(data={"id": instance.pk}, status=status.HTTP_201_CREATED)
 
     def partial_update(self, request, pk, *args, **kwargs):
         errors, data = self.controller.parse_request(self.update_schema, request.data)
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
 
-        instance = self.controller.get_instance_by_pk(pk=pk)
-        if not instance:
-            return JsonResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            errors, instance = self.controller.edit(instance_id=pk, **data.dict(exclude_unset=True))
+        except self.controller.model.DoesNotExist:
+            return ORJSONResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return ORJSONResponse(data={"id": instance.pk, "message": "Instance updated"}, status=status.HTTP_200_OK)
+
+    def parse_bulk_request(self, request_schema, data, with_id=False):
+        """Validate every item of a bulk request. Returns (errors, items) with errors listed per item index."""
+        if not isinstance(data, list):
+            return {"errors": "Expected a list of items"}, None
+        if len(data) > self.bulk_max_items:
+            return {"errors": f"At most {self.bulk_max_items} items are allowed per request"}, None
+
+        errors, items = [], []
+        for index, item in enumerate(data):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "errors": "Expected an object"})
+                continue
+            item = dict(item)
+            pk = item.pop('id', None)
+            if with_id and not isinstance(pk, int):
+                errors.append({"index": index, "errors": "An integer id is required"})
+                continue
+            error, parsed = self.controller.parse_request(request_schema, item)
+            if error:
+                errors.append({"index": index, **error})
+                continue
+            items.append((pk, parsed.dict(exclude_unset=True)) if with_id else parsed.dict())
+        if errors:
+            return {"errors": errors}, None
+        return None, items
+
+    @action(methods=['POST'], detail=False)
+    def bulk_create(self, request, *args, **kwargs):
+        errors, items = self.parse_bulk_request(self.create_schema, request.data)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
 
-        errors, instance = self.controller.edit(instance_id=pk, **data.dict())
+        errors, instances = self.controller.bulk_create(items, batch_size=self.bulk_batch_size)
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+            return ORJSONResponse(data={"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return ORJSONResponse(data={"ids": [instance.pk for instance in instances]}, status=status.HTTP_201_CREATED)
+
+    @action(methods=['PATCH'], detail=False)
+    def bulk_partial_update(self, request, *args, **kwargs):
+        errors, items = self.parse_bulk_request(self.update_schema, request.data, with_id=True)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changes_by_pk = dict(items)
+        existing = set(self.controller.model.objects.filter(pk__in=changes_by_pk).values_list('pk', flat=True))
+        missing = [{"id": pk, "errors": "Instance with this ID does not exist"}
+                   for pk in changes_by_pk if pk not in existing]
+        if missing:
+            return ORJSONResponse(data={"errors": missing}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors, ids = self.controller.bulk_edit(changes_by_pk, batch_size=self.bulk_batch_size)
+        if errors:
+            return ORJSONResponse(data={"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return ORJSONResponse(data={"ids": ids, "message": "Instances updated"}, status=status.HTTP_200_OK)
+
+    def get_sparse_fields(self):
+        """`?fields=` and `?expand=` as field trees; both empty means the full, default representation."""
+        query_params = self.request.query_params
+        return parse_field_tree(query_params.get('fields')), parse_field_tree(query_params.get('expand'))
+
+    def get_base_serializer(self):
+        if self.action == 'list' and self.list_serializer:
+            return self.list_serializer
+        return self.serializer
+
+    def get_serializer_class(self):
+        fields, expand = self.get_sparse_fields()
+        if not (fields or expand):
+            return self.get_base_serializer()
+        return get_sparse_serializer(self.get_base_serializer(), fields, expand)
 
-        return JsonResponse(data={"id": instance.pk, "message": "Instance updated"}, status=status.HTTP_200_OK)
+    def get_sparse_queryset(self, queryset):
+        """Adapt the controller's read plan so unrequested nested serializers trigger no joins or prefetches."""
+        fields, expand = self.get_sparse_fields()
+        if not (fields or expand):
+            return queryset
+        return self.controller.apply_sparse_query_plan(queryset, self.get_base_serializer(), fields, expand,
+                                                       list_mode=self.action == 'list')
+
+    def get_sparse_params(self):
+        fields, expand = self.get_sparse_fields()
+        return {'fields': format_field_tree(fields), 'expand': format_field_tree(expand)} if fields or expand else {}
+
+    def get_cache_version(self):
+        return get_cache_version(self.cache_models or (self.controller.model,))
+
+    def get_list_cache_key(self, request, paginator, filters):
+        if not (self.cache_key_list and self.cache_key_list.value):
+            return None
+        return build_cache_key(
+            self.cache_key_list,
+            version=self.get_cache_version(),
+            locale=get_language(),
+            page=paginator.get_page_key(request),
+            page_size=paginator.get_page_size(request),
+            params=build_filter_params(**filters, **self.get_sparse_params()),
+        )
+
+    def get_retrieve_cache_key(self, pk):
+        if not (self.cache_key_retrieve and self.cache_key_retrieve.value):
+            return None
+        return build_cache_key(
+            self.cache_key_retrieve,
+            version=self.get_cache_version(),
+            locale=get_language(),
+            pk=pk,
+            params=build_filter_params(**self.get_sparse_params()),
+        )
+
+    def get_validators(self, request, cache_key, queryset):
+        """
+        ETag and Last-Modified for a GET response.
+        A cache key already carries the generation of every model the payload reads, so hashing it costs no query.
+        Without one, fall back to the max `updated_at` and row count of the filtered queryset.
+        """
+        # Each negotiated format (json, msgpack) is its own representation.
+        representation = self.request.accepted_renderer.format
+        if cache_key:
+            return quote_etag(hashlib.md5(f"{cache_key}:{representation}".encode()).hexdigest()), None
+        if 'updated_at' not in {field.name for field in queryset.model._meta.concrete_fields}:
+            return None, None
+        state = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        last_modified = state['last_modified']
+        etag = f"{last_modified}:{state['count']}:{get_language()}:{request.get_full_path()}:{representation}"
+        return (
+            quote_etag(hashlib.md5(etag.encode()).hexdigest()),
+            calendar.timegm(last_modified.utctimetuple()) if last_modified else None,
+        )
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        patch_vary_headers(response, ('Accept',))
+        if etag:
+            response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
 
     def list(self, request, **kwargs):
         errors, data = self.controller.parse_request(self.list_schema, qdict_to_dict(request.query_params))
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
-
-        paginator = CustomPageNumberPagination()
-        page_key = request.query_params.get('page')
-        instance, cache_key = None, ""
-        if self.cache_key_list.value:
-            cache_key = build_cache_key(
-                self.cache_key_list,
-                page=page_key,
-                **data.dict()
-            )
-            instance = cache.get(cache_key)
-
-        if instance:
-            res = instance
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+
+        filters = data.dict()
+        errors, queryset = self.controller.filter(**filters)
+        if errors:
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.get_sparse_queryset(queryset)
+
+        paginator = self.pagination_class()
+        cache_key = self.get_list_cache_key(request, paginator, filters)
+        etag, last_modified = self.get_validators(request, cache_key, queryset)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if request.query_params.get('page', '').lower() == 'all':
+            return self.set_validators(self.stream_all(queryset, paginator), etag, last_modified)
+
+        if cache_key:
+            res = get_or_build(cache_key, lambda: self.paginate(paginator, queryset, request))
         else:
-            a = data.dict()
-            errors, data = self.controller.filter(**data.dict())
-            if errors:
-                return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
-            queryset = data  # Assuming data is a queryset here
-            page = paginator.paginate_queryset(queryset, request, view=self)
-            if page is not None:
-                res = self.controller.serialize_queryset(page, self.serializer)
-                if self.cache_key_list.value:
-                    cache.set(cache_key, res, timeout=Timeouts.MINUTES_10)
-                return paginator.get_paginated_response(res)
-            res = self.controller.serialize_queryset(queryset, self.serializer)
-
-        return JsonResponse(res, safe=False, status=status.HTTP_200_OK)
+            res = self.paginate(paginator, queryset, request)
+        return self.set_validators(Response(res, status=status.HTTP_200_OK), etag, last_modified)
+
+    def paginate(self, paginator, queryset, request):
+        serializer = self.get_serializer_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            res = self.controller.serialize_queryset(page, serializer)
+            return paginator.get_paginated_data(res)
+        return self.controller.serialize_queryset(queryset, serializer)
+
+    def stream_all(self, queryset, paginator):
+        """
+        `page=all` as a streamed JSON envelope: rows are read with a chunked iterator and serialized
+        `stream_chunk_size` at a time, so memory stays flat however many rows match.
+        """
+        renderer = ORJSONRenderer()
+        serializer = self.get_serializer_class()
+        count = queryset.count()
+
+        def chunks():
+            yield renderer.render({'count': count, 'next': '', 'previous': '', 'page_size': paginator.page_size})[:-1]
+            yield b',"results":['
+            rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+            separator = b''
+            while True:
+                chunk = list(islice(rows, self.stream_chunk_size))
+                if not chunk:
+                    break
+                yield separator + renderer.render(self.serialize_chunk(chunk, serializer))[1:-1]
+                separator = b','
+            yield b']}'
+
+        return StreamingHttpResponse(chunks(), content_type='application/json', status=status.HTTP_200_OK)
+
+    def serialize_chunk(self, rows, serializer):
+        """Serialize one `stream_all` chunk; override to add per-row data that is not part of the serializer."""
+        return self.controller.serialize_queryset(rows, serializer)
 
     def retrieve(self, request, pk, *args, **kwargs):
-        instance, cache_key = None, ""
-        if self.cache_key_retrieve.value:
-            cache_key = self.cache_key_retrieve.value.format(pk=pk)
-            instance = cache.get(cache_key)
-        if instance:
-            data = instance
+        cache_key = self.get_retrieve_cache_key(pk)
+        etag, last_modified = self.get_validators(request, cache_key, self.controller.model.objects.filter(pk=pk))
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if cache_key:
+            data = get_or_build(cache_key, lambda: self.serialize_instance(pk), local=self.local_cache_retrieve)
         else:
-            instance = self.controller.get_instance_by_pk(pk=pk)
-            if not instance:
-                return JsonResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
-            data = self.controller.serialize_one(instance, self.serializer)
-            if self.cache_key_retrieve:
-                cache.set(cache_key, data, timeout=Timeouts.MINUTES_10)
-        return JsonResponse(data=data, status=status.HTTP_200_OK)
+            data = self.serialize_instance(pk)
+        if data is None:
+            return ORJSONResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        return self.set_validators(self.render_response(data), etag, last_modified)
+
+    def render_response(self, data, status_code=status.HTTP_200_OK):
+        """
+        Render a payload in the negotiated format, outside DRF's Response.
+        Values are encoded with DjangoJSONEncoder, as the JsonResponse these endpoints used to return did.
+        """
+        renderer = self.request.accepted_renderer
+        if not isinstance(renderer, MessagePackRenderer):
+            return ORJSONResponse(data=data, status=status_code)
+        content = renderer.render(data, renderer_context={'encoder_class': DjangoJSONEncoder})
+        return HttpResponse(content, content_type=renderer.media_type, status=status_code)
+
+    def serialize_instance(self, pk):
+        instance = self.get_sparse_queryset(self.controller.get_queryset()).filter(pk=pk).first()
+        if not instance:
+            return None
+        return self.controller.serialize_one(instance, self.get_serializer_class())
 
     @action(methods=['POST'], detail=True)
     def make_inactive(self, request, pk, *args, **kwargs):
         instance = self.controller.get_instance_by_pk(pk=pk)
         if not instance:
-            return JsonResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
+            return ORJSONResponse({"error": "Instance with this ID does not exist"}, status=status.HTTP_404_NOT_FOUND)
         errors, _ = self.controller.make_inactive(instance)
         if errors:
-            return JsonResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
-        return JsonResponse(data={"message": "Successfully inactivated."}, status=status.HTTP_200_OK)
+            return ORJSONResponse(data=errors, status=status.HTTP_400_BAD_REQUEST)
+        return ORJSONResponse(data={"message": "Successfully inactivated."}, status=status.HTTP_200_OK)
@@ -383,6 +383,11 @@ REST_FRAMEWORK = {
     ),
     # "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "app.utils.renderers.ORJSONRenderer",
+        "app.utils.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     'DEFAULT_PAGINATION_CLASS': (
         'rest_framework.pagination.PageNumberPagination',
     ),
@@ -402,4 +407,16 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Per-worker LRU in front of the default cache for hot entity retrieves (see app/utils/local_cache.py).
+# Needs django_redis, invalidation is fanned out to workers over Redis pub/sub.
+LOCAL_CACHE_ENABLED = False
+LOCAL_CACHE_MAX_ENTRIES = 1024
+LOCAL_CACHE_TIMEOUT = 30  # seconds
+# Per-worker NumPy snapshot of unbooked plots answering /plots/faceted-search/ (see app/properties/inventory.py).
+# When disabled the same search runs against the database.
+PLOT_INVENTORY_ENABLED = True
+PLOT_INVENTORY_MAX_AGE = 600  # seconds before a full reload, to pick up deleted plots
+# Plot holds taken by sales officers expire on their own (see app/properties/holds.py).
+PLOT_HOLD_TIMEOUT = 30 * 60  # seconds
+PLOT_HOLD_MAX_TIMEOUT = 4 * 60 * 60
 TEXT_LOCAL_API_KEY = env("TEXT_LOCAL_API_KEY")
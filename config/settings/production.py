@@ -75,6 +75,9 @@ CACHES = {
         },
     }
 }
+LOCAL_CACHE_ENABLED = env.bool("LOCAL_CACHE_ENABLED", default=False)
+LOCAL_CACHE_MAX_ENTRIES = env.int("LOCAL_CACHE_MAX_ENTRIES", default=1024)
+LOCAL_CACHE_TIMEOUT = env.int("LOCAL_CACHE_TIMEOUT", default=30)
 
 # SECURITY
 # ------------------------------------------------------------------------------